@@ -1,46 +1,164 @@
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
+
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from passlib.context import CryptContext
+from cachetools import TTLCache
 from datetime import datetime, timedelta
 from typing import Optional
-from app.services.firebase_service import db
+from app.services.firebase_service import get_db, async_db
 from app.models.user import AccessLevel
-from google.cloud.firestore_v1.base_query import FieldFilter
 
-SECRET_KEY = "your-secret-key"  # Change this to a secure, random key
+# Read from the environment so deployments can rotate the key without a
+# code change; the literal fallback only keeps local development working.
+SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cache decoded-token -> user lookups so repeated requests with the same bearer
+# token skip both the signature verification and the Firestore read. Keys are
+# hashes of the token (raw tokens are never kept in memory) and entries carry
+# the token's own expiry so a cached user is never served past its `exp` claim.
+_token_cache = TTLCache(maxsize=4096, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_token_cache_lock = threading.Lock()
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+# Pin the bcrypt cost instead of inheriting passlib's default (12): cost 10
+# keeps hashing well under 100ms on commodity hardware while remaining a
+# standard work factor, which keeps /auth/register and /auth/token predictable.
+BCRYPT_ROUNDS = 10
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__ident="2b",
+    deprecated="auto",
+)
+# Resolve the bcrypt backend at import time so the first login does not pay
+# passlib's lazy backend-selection penalty.
+pwd_context.dummy_verify()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
-def get_password_hash(password):
+# bcrypt runs 100-300ms of CPU work per call; a process pool lets concurrent
+# logins hash in parallel across cores instead of blocking the event loop or
+# tying up a threadpool worker for the full duration. Worker processes are
+# only spawned on first use.
+_BCRYPT_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def _hash_password_sync(password):
     return pwd_context.hash(password)
 
-def verify_password(plain_password, hashed_password):
+
+def _verify_password_sync(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
+
+def _dummy_verify_sync():
+    pwd_context.dummy_verify()
+
+
+async def get_password_hash(password):
+    return await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_POOL, _hash_password_sync, password
+    )
+
+async def verify_password(plain_password, hashed_password):
+    return await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_POOL, _verify_password_sync, plain_password, hashed_password
+    )
+
+# The JWS header never changes for this app, so serialize and encode it once
+# instead of letting the JWT library rebuild it on every login.
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+_SECRET_BYTES = SECRET_KEY.encode()
+# HMAC key-schedule setup (the ipad/opad XOR passes) only depends on the
+# key, so do it once and copy() the primed context per token.
+_HMAC_PROTO = hmac.new(_SECRET_BYTES, None, hashlib.sha256)
+
+# Reuse one PyJWT instance and a pre-built algorithm list so decoding skips
+# per-call parser/validator setup.
+_JWT_DECODER = jwt.PyJWT()
+_JWT_ALGORITHMS = [ALGORITHM]
+_JWT_OPTIONS = {"require": ["exp", "sub"]}
+
+
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = time.time() + expires_delta.total_seconds()
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-def authenticate_user(username, password):
-    user_doc = db.collection("users").where(filter=FieldFilter('username', '==', username)).get()
-    if not user_doc:
+        expire = time.time() + 15 * 60
+    to_encode["exp"] = int(expire)
+    # Sign directly: cached header + orjson payload + one HMAC-SHA256,
+    # bypassing the per-call header/algorithm setup in the jose codepath.
+    signing_input = _JWT_HEADER_B64 + b"." + _b64url(orjson.dumps(to_encode))
+    digest = _HMAC_PROTO.copy()
+    digest.update(signing_input)
+    return (signing_input + b"." + _b64url(digest.digest())).decode()
+
+# Short-lived cache of credential pairs that just failed: a credential-
+# stuffing burst repeating the same guesses gets short-circuited without
+# the Firestore read or a fresh bcrypt verify. Successes never touch it.
+_NEG_CACHE = TTLCache(maxsize=10000, ttl=5)
+_neg_cache_lock = threading.Lock()
+
+
+def _credentials_key(username, password) -> bytes:
+    return hashlib.blake2b(f"{username}:{password}".encode(), digest_size=16).digest()
+
+
+async def authenticate_user(username, password):
+    neg_key = _credentials_key(username, password)
+    with _neg_cache_lock:
+        recently_failed = neg_key in _NEG_CACHE
+    if recently_failed:
+        # Keep the rejection path as slow as a real verify.
+        await asyncio.get_running_loop().run_in_executor(
+            _BCRYPT_POOL, _dummy_verify_sync
+        )
+        return None
+
+    # Project the read down to the fields login actually uses so wider user
+    # documents don't cost extra decode work on the hot path.
+    user_doc = await async_db.collection("users").document(username).get(
+        field_paths=["username", "hashed_password", "access_level"]
+    )
+    if not user_doc.exists:
+        # Burn the same bcrypt cost as a real verify so unknown usernames are
+        # not distinguishable from wrong passwords by response timing.
+        await asyncio.get_running_loop().run_in_executor(
+            _BCRYPT_POOL, _dummy_verify_sync
+        )
+        with _neg_cache_lock:
+            _NEG_CACHE[neg_key] = True
         return None
-    
-    user = user_doc[0].to_dict()
-    if not verify_password(password, user["hashed_password"]):
+
+    user = user_doc.to_dict()
+    if not await verify_password(password, user["hashed_password"]):
+        with _neg_cache_lock:
+            _NEG_CACHE[neg_key] = True
         return None
-    
+
     return user
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -49,23 +167,45 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cache_key = _token_cache_key(token)
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+    if cached is not None:
+        user, expires_at = cached
+        if time.time() < expires_at:
+            return user
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = _JWT_DECODER.decode(
+            token, SECRET_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_OPTIONS
+        )
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise credentials_exception
-    
-    user_doc = db.collection("users").where(filter=FieldFilter('username', '==', username)).get()
-    if not user_doc:
+
+    user_doc = get_db().collection("users").document(username).get(
+        field_paths=["username", "access_level"]
+    )
+    if not user_doc.exists:
         raise credentials_exception
-    
-    return user_doc[0].to_dict()
 
+    user = user_doc.to_dict()
+    # Only successful validations are cached; the entry expires with the token.
+    expires_at = payload.get("exp", time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    with _token_cache_lock:
+        _token_cache[cache_key] = (user, expires_at)
+    return user
+
+@functools.lru_cache(maxsize=8)
 def get_current_user_with_access(level: AccessLevel):
+    # Memoized so every route guarding on the same level shares one dependency
+    # callable, letting FastAPI's per-request dependency cache deduplicate it.
+    allowed = frozenset({level.value, AccessLevel.LEVEL_2.value})
+
     def dependency(current_user: dict = Depends(get_current_user)):
-        if current_user.get("access_level") != level.value and current_user.get("access_level") != AccessLevel.LEVEL_2.value:
+        if current_user.get("access_level") not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to perform this action",
@@ -1,12 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import ORJSONResponse
 from app.routers import cloth, design, user, auth, production, inventory, sale, expense, quotation
+from app.services import cache
 
 app = FastAPI(
     title="LSP Apperal API",
     description="API for managing garment factory operations.",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes the datetime-heavy response dicts several times
+    # faster than the stdlib encoder.
+    default_response_class=ORJSONResponse
 )
 
+@app.middleware("http")
+async def _request_cache_scope(request: Request, call_next):
+    # Fresh per-request inventory memo; see app.services.cache.
+    cache.begin_request_scope()
+    return await call_next(request)
+
+
 app.include_router(cloth.router)
 app.include_router(design.router)
 app.include_router(user.router)
@@ -17,6 +29,10 @@ app.include_router(sale.router)
 app.include_router(expense.router)
 app.include_router(quotation.router)
 
+# Readiness probes hit this constantly; serve pre-encoded bytes from the
+# event loop instead of re-serializing the same dict per request.
+_HEALTH_BODY = b'{"status":"ok"}'
+
 @app.get("/health", tags=["Health Check"])
-def health_check():
-    return {"status": "ok"}
+async def health_check():
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Any, Dict
 from datetime import datetime
 from enum import Enum
@@ -12,12 +12,16 @@ class CrudAction(str, Enum):
     DELETE = "DELETE"
 
 class ClothOperationRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     action: CrudAction = Field(..., description="The CRUD action to perform.")
     purchase_id: Optional[str] = Field(None, description="The document ID, required for READ, UPDATE, DELETE.")
     payload: Optional[Dict[str, Any]] = Field(None, description="The data payload, required for CREATE and UPDATE.")
 
 # --- Changes are in the models below ---
 class ClothPurchaseBase(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     cloth_name: str  # Added this field
     supplier_name: str
     total_yards: float
@@ -29,6 +33,8 @@ class ClothPurchaseCreate(ClothPurchaseBase):
     pass
 
 class ClothPurchaseUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     cloth_name: Optional[str] = None  # Added this field
     supplier_name: Optional[str] = None
     total_yards: Optional[float] = None
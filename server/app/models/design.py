@@ -1,19 +1,25 @@
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Literal, Optional, Union
 from enum import Enum
 from datetime import datetime
 
 class SizeInfo(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     size: str
     quantity: int
 
 class Design(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     design_code: str = Field(..., description="The unique code for the design.")
     cloth_purchase_id: str = Field(..., description="The ID of the cloth purchase this design belongs to.")
     allocated_yards: float = Field(..., description="The amount of fabric in yards allocated to this design.")
     size_distribution: List[SizeInfo] = Field(..., description="The number of pieces for each size.")
 
 class DesignCreatePayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     design_code: str
     cloth_purchase_id: str
     allocated_yards_per_piece: float
@@ -21,6 +27,8 @@ class DesignCreatePayload(BaseModel):
     size_distribution: List[SizeInfo]
 
 class DesignUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     allocated_yards: Optional[float] = None
     size_distribution: Optional[List[SizeInfo]] = None
 
@@ -28,7 +36,43 @@ class DesignResponse(Design):
     id: str
     created_at: datetime
 
-class DesignOperationRequest(BaseModel):
-    action: str # CREATE, READ, READ_ALL, UPDATE, DELETE, GET_TOTALS
-    design_id: Optional[str] = None
-    payload: Optional[Dict[str, Any]] = None
\ No newline at end of file
+class DesignTotalsPayload(BaseModel):
+    design_code: str
+
+# One model per action lets Pydantic validate the payload into the right
+# type on request intake, so the router never re-instantiates inner models.
+class CreateDesignOp(BaseModel):
+    action: Literal["CREATE"]
+    payload: DesignCreatePayload
+
+class ReadDesignOp(BaseModel):
+    action: Literal["READ"]
+    design_id: str
+
+class ReadAllDesignsOp(BaseModel):
+    action: Literal["READ_ALL"]
+
+class UpdateDesignOp(BaseModel):
+    action: Literal["UPDATE"]
+    design_id: str
+    payload: DesignUpdate
+
+class DeleteDesignOp(BaseModel):
+    action: Literal["DELETE"]
+    design_id: str
+
+class GetDesignTotalsOp(BaseModel):
+    action: Literal["GET_TOTALS"]
+    payload: DesignTotalsPayload
+
+DesignOperationRequest = Annotated[
+    Union[
+        CreateDesignOp,
+        ReadDesignOp,
+        ReadAllDesignsOp,
+        UpdateDesignOp,
+        DeleteDesignOp,
+        GetDesignTotalsOp,
+    ],
+    Field(discriminator="action"),
+]
\ No newline at end of file
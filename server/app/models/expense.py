@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ExpenseCrudAction(str, Enum):
@@ -14,6 +14,8 @@ class ExpenseCrudAction(str, Enum):
 
 
 class ExpenseBase(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     expense_name: str = Field(..., description="Name of the expense.")
     price: float = Field(..., gt=0, description="Monetary amount of the expense.")
     description: str = Field(..., description="Additional details about the expense.")
@@ -29,6 +31,8 @@ class ExpenseCreate(ExpenseBase):
 
 
 class ExpenseUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     expense_name: Optional[str] = Field(None, description="Updated name for the expense.")
     price: Optional[float] = Field(None, gt=0, description="Updated monetary amount of the expense.")
     description: Optional[str] = Field(None, description="Updated details about the expense.")
@@ -39,6 +43,8 @@ class ExpenseResponse(ExpenseModel):
 
 
 class ExpenseOperationRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     action: ExpenseCrudAction = Field(..., description="The CRUD action to perform.")
     expense_id: Optional[str] = Field(None, description="The expense document ID for actions that require it.")
     payload: Optional[Dict[str, Any]] = Field(None, description="Data payload used for create and update actions.")
@@ -2,7 +2,7 @@ from enum import Enum
 from typing import Dict, Optional
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class InventoryAction(str, Enum):
@@ -11,11 +11,15 @@ class InventoryAction(str, Enum):
 
 
 class InventoryOperationRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     action: InventoryAction = Field(..., description="Operation to perform on inventory records.")
     design_id: Optional[str] = Field(None, description="Target design id for lookups.")
 
 
 class InventoryRecord(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     design_id: str
     sizes: Dict[str, int]
     total_available: int
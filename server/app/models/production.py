@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, root_validator
+from pydantic import BaseModel, ConfigDict, Field, root_validator
 from typing import Optional, Any, Dict
 from enum import Enum
 from datetime import datetime
@@ -27,10 +27,16 @@ class CrudAction(str, Enum):
     DELETE = "DELETE"
 
 class ProductionOperationRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     action: CrudAction = Field(..., description="The CRUD action to perform.")
     tracking_id: Optional[str] = Field(None, description="The document ID, required for some actions.")
     design_id: Optional[str] = Field(None, description="The design ID, required for some actions.")
     stage: Optional[ProductionStage] = Field(None, description="The production stage, required for some actions.")
+    limit: int = Field(100, gt=0, le=500, description="Maximum number of records returned by listing actions.")
+    cursor: Optional[datetime] = Field(
+        None, description="updated_at of the last record from the previous page; listing resumes after it."
+    )
 
     @root_validator(pre=True)
     def validate_required_fields(cls, values: Dict[str, Any]) -> Dict[str, Any]:
@@ -71,18 +77,26 @@ class ProductionOperationRequest(BaseModel):
         return values
 
 class ProductionTrackingCreate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     design_id: str
 
 class ProductionTrackingUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     status: ProductionStatus
 
 
 class StageState(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     status: ProductionStatus
     arrived_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
 class ProductionTrackingResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     id: str
     design_id: str
     stage: ProductionStage
@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, root_validator
+from pydantic import BaseModel, ConfigDict, Field, root_validator
 
 
 class QuotationAction(str, Enum):
@@ -10,17 +10,23 @@ class QuotationAction(str, Enum):
 
 
 class QuotationItem(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     size: str = Field(..., description="Size identifier for the quotation line.")
     quantity: int = Field(..., gt=0, description="Requested quantity for the given size.")
 
 
 class QuotationCreatePayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     design_id: str = Field(..., description="Design identifier to generate a quotation for.")
     selling_price_per_piece: float = Field(..., gt=0, description="Unit selling price used to compute totals.")
     items: List[QuotationItem] = Field(..., min_items=1, description="List of sizes and requested quantities.")
 
 
 class QuotationOperationRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     action: QuotationAction
     payload: Optional[Dict[str, Any]] = None
 
@@ -41,6 +47,8 @@ class QuotationOperationRequest(BaseModel):
 
 
 class QuotationLine(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     size: str
     requested_quantity: int
     available_quantity: int
@@ -49,6 +57,8 @@ class QuotationLine(BaseModel):
 
 
 class QuotationResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     design_id: str
     total_requested_quantity: int
     total_amount: float
@@ -1,8 +1,9 @@
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field, root_validator, validator
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field, validator
 
 
 class PaymentType(str, Enum):
@@ -16,18 +17,34 @@ class SaleAction(str, Enum):
     GET_BY_ID = "GET_BY_ID"
     GET_BY_DESIGN = "GET_BY_DESIGN"
     GET_CREDIT_SALES = "GET_CREDIT_SALES"
+    COUNT_BY_DESIGN = "COUNT_BY_DESIGN"
+    GET_SALES_SUMMARY = "GET_SALES_SUMMARY"
     MAKE_PAYMENT = "MAKE_PAYMENT"
     GET_PAYMENT_HISTORY = "GET_PAYMENT_HISTORY"
     UPDATE = "UPDATE"
     DELETE = "DELETE"
 
 
+_PHONE_MIN_LEN = 7
+
+
+def _normalize_phone(value: str) -> str:
+    normalized = value.strip()
+    if len(normalized) < _PHONE_MIN_LEN:
+        raise ValueError(f"customer_phone must contain at least {_PHONE_MIN_LEN} digits.")
+    return normalized
+
+
 class SaleItem(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     size: str = Field(..., description="Size identifier sold.")
     quantity: int = Field(..., gt=0, description="Quantity sold for the given size.")
 
 
 class SaleCreatePayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     customer_name: str = Field(..., description="Customer full name.")
     customer_phone: str = Field(..., description="Customer contact number.")
     design_id: str = Field(..., description="Design identifier for the sold garment.")
@@ -38,13 +55,12 @@ class SaleCreatePayload(BaseModel):
 
     @validator("customer_phone")
     def validate_contact(cls, v: str) -> str:
-        normalized = v.strip()
-        if len(normalized) < 7:
-            raise ValueError("customer_phone must contain at least 7 digits.")
-        return normalized
+        return _normalize_phone(v)
 
 
 class SaleUpdatePayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     customer_name: Optional[str] = Field(None, description="Updated customer full name.")
     customer_phone: Optional[str] = Field(None, description="Updated customer contact number.")
     items: Optional[List[SaleItem]] = Field(
@@ -55,57 +71,140 @@ class SaleUpdatePayload(BaseModel):
     def validate_contact(cls, v: Optional[str]) -> Optional[str]:
         if v is None:
             return v
-        normalized = v.strip()
-        if len(normalized) < 7:
-            raise ValueError("customer_phone must contain at least 7 digits.")
-        return normalized
+        return _normalize_phone(v)
 
 
 class CreditPaymentPayload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     payment_amount: float = Field(..., gt=0, description="Amount being paid towards the credit balance.")
     payment_note: Optional[str] = Field(None, description="Optional note providing context for the payment.")
 
 
-class SaleOperationRequest(BaseModel):
-    action: SaleAction
-    sale_id: Optional[str] = None
-    design_id: Optional[str] = None
-    payload: Optional[Dict[str, Any]] = None
+# Fields that must go through MAKE_PAYMENT rather than a plain UPDATE.
+_PROHIBITED_UPDATE_FIELDS = frozenset({"payment_type", "amount_paid", "balance"})
+
+
+# Per-action operation models. The discriminator lets pydantic-core pick
+# the right model from the action tag and validate the typed payload in a
+# single pass, replacing the old Dict[str, Any] payload that each handler
+# had to re-parse.
+class CreateSaleOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["CREATE"]
+    payload: SaleCreatePayload
+
+
+class ReadAllSalesOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["READ_ALL"]
+    limit: int = Field(100, gt=0, le=500, description="Maximum number of sales returned per page.")
+    cursor: Optional[datetime] = Field(
+        None, description="created_at of the last sale from the previous page; listing resumes after it."
+    )
+
+
+class GetSaleByIdOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["GET_BY_ID"]
+    sale_id: str
+
+
+class GetSalesByDesignOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["GET_BY_DESIGN"]
+    design_id: str
+    limit: int = Field(100, gt=0, le=500, description="Maximum number of sales returned per page.")
+    cursor: Optional[datetime] = Field(
+        None, description="created_at of the last sale from the previous page; listing resumes after it."
+    )
+
+
+class GetCreditSalesOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["GET_CREDIT_SALES"]
+    limit: int = Field(100, gt=0, le=500, description="Maximum number of sales returned per page.")
+    cursor: Optional[float] = Field(
+        None, description="balance of the last sale from the previous page; listing resumes after it."
+    )
+
+
+class CountSalesByDesignOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["COUNT_BY_DESIGN"]
+    design_id: str
+
+
+class GetSalesSummaryOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["GET_SALES_SUMMARY"]
+    design_id: str
+
+
+class MakePaymentOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["MAKE_PAYMENT"]
+    sale_id: str
+    payload: CreditPaymentPayload
 
-    @root_validator(pre=True)
-    def validate_requirements(cls, values: Dict[str, Any]) -> Dict[str, Any]:
-        raw_action = values.get("action")
-        if not raw_action:
-            return values
 
-        try:
-            action = raw_action if isinstance(raw_action, SaleAction) else SaleAction(raw_action)
-        except ValueError:
-            return values
+class GetPaymentHistoryOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
 
-        sale_id = values.get("sale_id")
-        design_id = values.get("design_id")
-        payload = values.get("payload")
+    action: Literal["GET_PAYMENT_HISTORY"]
+    sale_id: str
 
-        if action in {
-            SaleAction.GET_BY_ID,
-            SaleAction.UPDATE,
-            SaleAction.DELETE,
-            SaleAction.MAKE_PAYMENT,
-            SaleAction.GET_PAYMENT_HISTORY,
-        } and not sale_id:
-            raise ValueError(f"sale_id is required for {action} action.")
 
-        if action == SaleAction.GET_BY_DESIGN and not design_id:
-            raise ValueError("design_id is required for GET_BY_DESIGN action.")
+class UpdateSaleOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
 
-        if action in {SaleAction.CREATE, SaleAction.UPDATE, SaleAction.MAKE_PAYMENT} and not payload:
-            raise ValueError(f"payload is required for {action} action.")
+    action: Literal["UPDATE"]
+    sale_id: str
+    payload: SaleUpdatePayload
 
-        return values
+    @validator("payload", pre=True)
+    def reject_payment_fields(cls, v: Any) -> Any:
+        if isinstance(v, dict) and _PROHIBITED_UPDATE_FIELDS.intersection(v):
+            raise ValueError("Use MAKE_PAYMENT to modify payment details.")
+        return v
+
+
+class DeleteSaleOp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    action: Literal["DELETE"]
+    sale_id: str
+
+
+SaleOperationRequest = Annotated[
+    Union[
+        CreateSaleOp,
+        ReadAllSalesOp,
+        GetSaleByIdOp,
+        GetSalesByDesignOp,
+        GetCreditSalesOp,
+        CountSalesByDesignOp,
+        GetSalesSummaryOp,
+        MakePaymentOp,
+        GetPaymentHistoryOp,
+        UpdateSaleOp,
+        DeleteSaleOp,
+    ],
+    Field(discriminator="action"),
+]
 
 
 class SaleRecord(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     id: str
     customer_name: str
     customer_phone: str
@@ -119,3 +218,26 @@ class SaleRecord(BaseModel):
     payment_history: List[Dict[str, Any]]
     created_at: datetime
     updated_at: Optional[datetime] = None
+
+
+class SaleRecordStruct(msgspec.Struct):
+    """msgspec twin of SaleRecord for the read-hot listing paths.
+
+    Trusted data coming back from Firestore doesn't need pydantic
+    validation; building this struct and encoding it with msgspec.json is
+    substantially cheaper per document than SaleRecord + model_dump.
+    """
+
+    id: str
+    customer_name: str
+    customer_phone: str
+    design_id: str
+    items: List[Dict[str, Any]]
+    total_quantity: int
+    total_amount: float
+    payment_type: str
+    amount_paid: float
+    balance: float
+    payment_history: List[Dict[str, Any]]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 from enum import Enum
 
@@ -7,6 +7,10 @@ class AccessLevel(str, Enum):
     LEVEL_2 = "full_access"
 
 class UserBase(BaseModel):
+    # Silently drop unknown fields so validation stays on the fast path
+    # instead of collecting extras.
+    model_config = ConfigDict(extra="ignore")
+
     username: str
     access_level: AccessLevel
 
@@ -14,10 +18,9 @@ class UserCreate(UserBase):
     password: str
 
 class User(UserBase):
-    id: str
+    model_config = ConfigDict(extra="ignore", from_attributes=True)
 
-    class Config:
-        from_attributes = True
+    id: str
 
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(obj):
+    # Firestore hands timestamps back as DatetimeWithNanoseconds, a
+    # datetime subclass orjson refuses to encode natively; isoformat
+    # keeps the same ISO-8601 shape jsonable_encoder produces. str stays
+    # as the last resort for the rest (e.g. Decimal).
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson.
+
+    orjson is several times faster than the stdlib encoder; the default
+    hook covers the Firestore types it rejects. Returning an instance of
+    this class directly from a handler also skips FastAPI's
+    jsonable_encoder pass over the payload.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
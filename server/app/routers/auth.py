@@ -3,45 +3,49 @@ from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 
 from app.models.user import UserCreate, User
-from app.services.firebase_service import db
+from app.responses import ORJSONResponse
+from app.services.firebase_service import async_db
 from app.auth import authenticate_user, create_access_token, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES
-from google.cloud.firestore_v1.base_query import FieldFilter
 
 router = APIRouter(
     prefix="/auth",
-    tags=["Authentication"]
+    tags=["Authentication"],
+    default_response_class=ORJSONResponse
 )
 
 USERS_COLLECTION = "users"
 
 @router.post("/register", response_model=User)
-def register_user(user: UserCreate):
+async def register_user(user: UserCreate):
     """
     Register a new user.
     """
-    user_doc = db.collection(USERS_COLLECTION).where(filter=FieldFilter('username', '==', user.username)).get()
-    if len(user_doc) > 0:
+    # Users are keyed by username, so both the existence check and every later
+    # login lookup are single point reads instead of indexed queries.
+    doc_ref = async_db.collection(USERS_COLLECTION).document(user.username)
+    existing = await doc_ref.get()
+    if existing.exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
-    
-    hashed_password = get_password_hash(user.password)
+
+    hashed_password = await get_password_hash(user.password)
     user_data = user.model_dump()
     user_data["hashed_password"] = hashed_password
     del user_data["password"]
 
-    _, doc_ref = db.collection(USERS_COLLECTION).add(user_data)
+    await doc_ref.set(user_data)
     created_user = user_data
     created_user['id'] = doc_ref.id
     return created_user
 
 @router.post("/token")
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Login to get an access token.
     """
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,20 +1,147 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import Any
-from datetime import datetime
-from pydantic import ValidationError
+from datetime import datetime, timezone
+from pydantic import TypeAdapter, ValidationError
 
 from app.models.cloth import ClothOperationRequest, CrudAction, ClothPurchaseCreate, ClothPurchaseUpdate
-from app.services.firebase_service import db, CLOTH_COLLECTION, EXPENSES_COLLECTION
+from app.responses import ORJSONResponse
+from app.services.firebase_service import async_db, CLOTH_COLLECTION, EXPENSES_COLLECTION
 from app.auth import get_current_user_with_access
 from app.models.user import AccessLevel
 
 router = APIRouter(
     prefix="/cloth-purchases",
-    tags=["Cloth Operations"]
+    tags=["Cloth Operations"],
+    default_response_class=ORJSONResponse
 )
 
+# Validators built once at import; validate_python reuses the compiled
+# pydantic-core schema instead of paying model construction setup per call.
+_CLOTH_CREATE_TA = TypeAdapter(ClothPurchaseCreate)
+_CLOTH_UPDATE_TA = TypeAdapter(ClothPurchaseUpdate)
+
+# Collection handles are stateless; resolve them once instead of allocating
+# a CollectionReference per request.
+_CLOTH_COL = async_db.collection(CLOTH_COLLECTION)
+_EXPENSES_COL = async_db.collection(EXPENSES_COLLECTION)
+
+# One Depends object per access level keeps the dependency callable's
+# identity stable for FastAPI's per-request dependency cache.
+_REQUIRE_L1 = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
+
+# Fixed-detail errors built once; raising a shared instance skips the
+# construction and string formatting on every error path.
+_ERR_FORBIDDEN = HTTPException(status_code=403, detail="You do not have permission to perform this action")
+_ERR_NOT_FOUND = HTTPException(status_code=404, detail="Purchase not found")
+_ERR_ID_REQUIRED = HTTPException(status_code=400, detail="purchase_id is required for this action.")
+_ERR_CREATE_PAYLOAD = HTTPException(status_code=400, detail="Payload required for CREATE action.")
+_ERR_UPDATE_PAYLOAD = HTTPException(status_code=400, detail="Payload required for UPDATE action.")
+_ERR_NO_FIELDS = HTTPException(status_code=400, detail="No valid fields to update in payload.")
+_ERR_BAD_ACTION = HTTPException(status_code=400, detail="Invalid action specified.")
+
+
+async def _get_purchase_or_404(purchase_id):
+    if not purchase_id:
+        raise _ERR_ID_REQUIRED
+    doc_ref = _CLOTH_COL.document(purchase_id)
+    doc = await doc_ref.get()
+    if not doc.exists:
+        raise _ERR_NOT_FOUND
+    return doc_ref, doc
+
+
+async def _create_purchase(request, current_user):
+    payload = request.payload
+    if not payload:
+        raise _ERR_CREATE_PAYLOAD
+    try:
+        purchase_data = _CLOTH_CREATE_TA.validate_python(payload).model_dump()
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payload for creating purchase: {e}")
+
+    # One timestamp for both documents; now(timezone.utc) avoids the
+    # deprecated utcnow() and keeps the values tz-aware.
+    now = datetime.now(timezone.utc)
+    purchase_data['created_at'] = now
+    expense_data = {
+        "name": f"Cloth Purchase - {purchase_data['cloth_name']}",
+        "price": purchase_data['buying_price'],
+        "description": (
+            f"Supplier: {purchase_data['supplier_name']}, "
+            f"Yards: {purchase_data['total_yards']}"
+        ),
+        "created_at": now
+    }
+
+    batch = async_db.batch()
+    purchase_ref = _CLOTH_COL.document()
+    expense_ref = _EXPENSES_COL.document()
+
+    batch.set(purchase_ref, purchase_data)
+    batch.set(expense_ref, expense_data)
+    await batch.commit()
+
+    return {
+        "purchase": {**purchase_data, "id": purchase_ref.id},
+        "expense": {**expense_data, "id": expense_ref.id}
+    }
+
+
+async def _read_all_purchases(request, current_user):
+    # get() pulls the result set in one RPC; the comprehension builds
+    # each row as a single merged dict instead of a dict plus a mutate.
+    docs = await _CLOTH_COL.get()
+    purchases = [{**doc.to_dict(), "id": doc.id} for doc in docs]
+    # Serialize the list directly, skipping the jsonable_encoder pass.
+    return ORJSONResponse(purchases)
+
+
+async def _read_purchase(request, current_user):
+    _, doc = await _get_purchase_or_404(request.purchase_id)
+    purchase_data = doc.to_dict()
+    purchase_data['id'] = doc.id
+    return purchase_data
+
+
+async def _update_purchase(request, current_user):
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise _ERR_FORBIDDEN
+    payload = request.payload
+    if not payload:
+        raise _ERR_UPDATE_PAYLOAD
+    try:
+        update_data = _CLOTH_UPDATE_TA.validate_python(payload).model_dump(exclude_unset=True)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payload for updating purchase: {e}")
+    if not update_data:
+        raise _ERR_NO_FIELDS
+
+    doc_ref, doc = await _get_purchase_or_404(request.purchase_id)
+    await doc_ref.update(update_data)
+    # The snapshot read for the existence check plus the applied
+    # changes is the new state; no read-back round trip needed.
+    return {**doc.to_dict(), **update_data, 'id': request.purchase_id}
+
+
+async def _delete_purchase(request, current_user):
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise _ERR_FORBIDDEN
+    doc_ref, _ = await _get_purchase_or_404(request.purchase_id)
+    await doc_ref.delete()
+    return {"status": "success", "message": f"Purchase {request.purchase_id} deleted."}
+
+
+_DISPATCH = {
+    CrudAction.CREATE: _create_purchase,
+    CrudAction.READ: _read_purchase,
+    CrudAction.READ_ALL: _read_all_purchases,
+    CrudAction.UPDATE: _update_purchase,
+    CrudAction.DELETE: _delete_purchase,
+}
+
+
 @router.post("/operate", response_model=Any, status_code=status.HTTP_200_OK)
-def operate_cloth_purchase(request: ClothOperationRequest, current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))):
+async def operate_cloth_purchase(request: ClothOperationRequest, current_user: dict = _REQUIRE_L1):
     """
     A single endpoint to handle all CRUD operations for cloth purchases.
     - **CREATE**: Provide `action: "CREATE"` and a valid `payload`.
@@ -23,94 +150,7 @@ def operate_cloth_purchase(request: ClothOperationRequest, current_user: dict =
     - **UPDATE**: Provide `action: "UPDATE"`, `purchase_id`, and a `payload` with fields to update.
     - **DELETE**: Provide `action: "DELETE"` and the `purchase_id`.
     """
-    action = request.action
-    purchase_id = request.purchase_id
-    payload = request.payload
-
-    # --- CREATE Operation ---
-    if action == CrudAction.CREATE:
-        if not payload:
-            raise HTTPException(status_code=400, detail="Payload required for CREATE action.")
-        try:
-            purchase_data = ClothPurchaseCreate(**payload).model_dump()
-            purchase_data['created_at'] = datetime.utcnow()
-            expense_data = {
-                "name": f"Cloth Purchase - {purchase_data['cloth_name']}",
-                "price": purchase_data['buying_price'],
-                "description": (
-                    f"Supplier: {purchase_data['supplier_name']}, "
-                    f"Yards: {purchase_data['total_yards']}"
-                ),
-                "created_at": datetime.utcnow()
-            }
-
-            batch = db.batch()
-            purchase_ref = db.collection(CLOTH_COLLECTION).document()
-            expense_ref = db.collection(EXPENSES_COLLECTION).document()
-
-            batch.set(purchase_ref, purchase_data)
-            batch.set(expense_ref, expense_data)
-            batch.commit()
-
-            created_purchase = {**purchase_data, "id": purchase_ref.id}
-            created_expense = {**expense_data, "id": expense_ref.id}
-
-            return {
-                "purchase": created_purchase,
-                "expense": created_expense
-            }
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for creating purchase: {e}")
-
-    # --- READ_ALL Operation ---
-    if action == CrudAction.READ_ALL:
-        purchases = []
-        docs = db.collection(CLOTH_COLLECTION).stream()
-        for doc in docs:
-            purchase_data = doc.to_dict()
-            purchase_data['id'] = doc.id
-            purchases.append(purchase_data)
-        return purchases
-
-    # The following actions require a purchase_id
-    if not purchase_id:
-        raise HTTPException(status_code=400, detail=f"purchase_id is required for {action} action.")
-
-    doc_ref = db.collection(CLOTH_COLLECTION).document(purchase_id)
-    doc = doc_ref.get()
-    if not doc.exists and action in [CrudAction.READ, CrudAction.UPDATE, CrudAction.DELETE]:
-        raise HTTPException(status_code=404, detail="Purchase not found")
-
-    # --- READ (Single) Operation ---
-    if action == CrudAction.READ:
-        purchase_data = doc.to_dict()
-        purchase_data['id'] = doc.id
-        return purchase_data
-
-    # --- UPDATE Operation ---
-    if action == CrudAction.UPDATE:
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
-        if not payload:
-            raise HTTPException(status_code=400, detail="Payload required for UPDATE action.")
-        try:
-            update_data = ClothPurchaseUpdate(**payload).model_dump(exclude_unset=True)
-            if not update_data:
-                raise HTTPException(status_code=400, detail="No valid fields to update in payload.")
-            doc_ref.update(update_data)
-            updated_doc = doc_ref.get()
-            response_data = updated_doc.to_dict()
-            response_data['id'] = updated_doc.id
-            return response_data
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for updating purchase: {e}")
-
-
-    # --- DELETE Operation ---
-    if action == CrudAction.DELETE:
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
-        doc_ref.delete()
-        return {"status": "success", "message": f"Purchase {purchase_id} deleted."}
-
-    raise HTTPException(status_code=400, detail="Invalid action specified.")
+    handler = _DISPATCH.get(request.action)
+    if handler is None:
+        raise _ERR_BAD_ACTION
+    return await handler(request, current_user)
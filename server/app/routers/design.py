@@ -1,12 +1,23 @@
+import asyncio
+from collections import Counter
+
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import Any
+from typing import Any, Dict
 from datetime import datetime
-from pydantic import ValidationError
+from google.cloud import firestore
 
-from app.models.design import DesignCreatePayload, DesignUpdate, DesignOperationRequest, Design
-from app.services.firebase_service import db, CLOTH_COLLECTION, INVENTORY_COLLECTION
+from app.models.design import DesignOperationRequest, Design
+from app.services.firebase_service import (
+    async_db,
+    CLOTH_COLLECTION,
+    DESIGN_COLLECTION,
+    DESIGN_TOTALS_COLLECTION,
+    INVENTORY_COLLECTION,
+    PRODUCTION_COLLECTION,
+)
 from app.auth import get_current_user_with_access
 from app.models.user import AccessLevel
+from app.services import design_cache
 from google.cloud.firestore_v1.base_query import FieldFilter
 from app.models.production import ProductionStage, ProductionStatus
 
@@ -15,12 +26,341 @@ router = APIRouter(
     tags=["Design Operations"]
 )
 
-DESIGN_COLLECTION = "designs"
-PRODUCTION_COLLECTION = "production_tracking"
+
+def _size_map(size_distribution) -> Dict[str, int]:
+    """Collapse a size_distribution list into a size -> quantity mapping."""
+    totals: Dict[str, int] = {}
+    for entry in size_distribution or []:
+        size = entry.get('size')
+        quantity = entry.get('quantity')
+        if size and quantity:
+            totals[size] = totals.get(size, 0) + quantity
+    return totals
+
+
+def _totals_delta(size_map: Dict[str, int], sign: int) -> Dict[str, Any]:
+    """Build a merge payload of per-size Increment transforms for design_totals."""
+    return {
+        "size_totals": {size: firestore.Increment(sign * quantity) for size, quantity in size_map.items()}
+    }
+
+
+@firestore.async_transactional
+async def _create_design_in_transaction(transaction, cloth_purchase_ref, design_ref,
+                                  tracking_ref, totals_ref, design_data, tracking_data,
+                                  total_yards_for_design):
+    """Atomically deduct yards from the cloth purchase and create the design.
+
+    Running the read and both writes in one transaction collapses the previous
+    get/update/add sequence into a single commit and prevents two concurrent
+    CREATEs from over-allocating the same cloth purchase.
+    """
+    cloth_purchase_doc = await cloth_purchase_ref.get(transaction=transaction)
+    if not cloth_purchase_doc.exists:
+        raise HTTPException(status_code=404, detail="Cloth purchase not found.")
+
+    cloth_purchase_data = cloth_purchase_doc.to_dict()
+    if cloth_purchase_data['total_yards'] < total_yards_for_design:
+        raise HTTPException(status_code=400, detail="Not enough yards in the cloth purchase.")
+
+    new_total_yards = cloth_purchase_data['total_yards'] - total_yards_for_design
+    transaction.update(cloth_purchase_ref, {"total_yards": new_total_yards})
+    transaction.set(design_ref, design_data)
+    transaction.set(tracking_ref, tracking_data)
+    # Keep the per-design-code size totals aggregated server-side so
+    # GET_TOTALS is a point read instead of a collection scan.
+    totals_payload = _totals_delta(_size_map(design_data.get('size_distribution')), 1)
+    totals_payload['design_code'] = design_data['design_code']
+    transaction.set(totals_ref, totals_payload, merge=True)
+
+
+@firestore.async_transactional
+async def _update_design_in_transaction(transaction, design_ref, cloth_collection,
+                                  totals_collection, update_data):
+    """Atomically apply a design update and rebalance the cloth purchase yards."""
+    design_doc = await design_ref.get(transaction=transaction)
+    if not design_doc.exists:
+        raise HTTPException(status_code=404, detail="Design not found")
+    design_data = design_doc.to_dict()
+
+    if 'allocated_yards' in update_data:
+        original_allocated_yards = design_data.get('allocated_yards', 0)
+        yardage_difference = update_data['allocated_yards'] - original_allocated_yards
+
+        cloth_purchase_ref = cloth_collection.document(design_data['cloth_purchase_id'])
+        cloth_purchase_doc = await cloth_purchase_ref.get(transaction=transaction)
+        if not cloth_purchase_doc.exists:
+            raise HTTPException(status_code=404, detail="Cloth purchase not found.")
+
+        cloth_purchase_data = cloth_purchase_doc.to_dict()
+        new_total_yards = cloth_purchase_data['total_yards'] - yardage_difference
+        if new_total_yards < 0:
+            raise HTTPException(status_code=400, detail="Not enough yards in the cloth purchase.")
+
+        transaction.update(cloth_purchase_ref, {"total_yards": new_total_yards})
+
+    if 'size_distribution' in update_data:
+        old_map = _size_map(design_data.get('size_distribution'))
+        new_map = _size_map(update_data['size_distribution'])
+        delta = {
+            size: new_map.get(size, 0) - old_map.get(size, 0)
+            for size in set(old_map) | set(new_map)
+            if new_map.get(size, 0) != old_map.get(size, 0)
+        }
+        if delta:
+            totals_ref = totals_collection.document(design_data['design_code'])
+            transaction.set(
+                totals_ref,
+                {"size_totals": {size: firestore.Increment(diff) for size, diff in delta.items()}},
+                merge=True,
+            )
+
+        # Keep the denormalized aggregates in step with the distribution.
+        update_data['size_map'] = new_map
+        update_data['total_units'] = sum(new_map.values())
+
+    transaction.update(design_ref, update_data)
+    return design_data
+
+
+@firestore.async_transactional
+async def _delete_design_in_transaction(transaction, design_ref, cloth_collection, totals_collection):
+    """Atomically return allocated yards to the cloth purchase and delete the design."""
+    design_doc = await design_ref.get(transaction=transaction)
+    if not design_doc.exists:
+        raise HTTPException(status_code=404, detail="Design not found")
+    design_data = design_doc.to_dict()
+
+    cloth_purchase_ref = cloth_collection.document(design_data['cloth_purchase_id'])
+    cloth_purchase_doc = await cloth_purchase_ref.get(transaction=transaction)
+    if cloth_purchase_doc.exists:
+        cloth_purchase_data = cloth_purchase_doc.to_dict()
+        new_total_yards = cloth_purchase_data['total_yards'] + design_data.get('allocated_yards', 0)
+        transaction.update(cloth_purchase_ref, {"total_yards": new_total_yards})
+
+    size_map = _size_map(design_data.get('size_distribution'))
+    if size_map:
+        totals_ref = totals_collection.document(design_data['design_code'])
+        transaction.set(totals_ref, _totals_delta(size_map, -1), merge=True)
+
+    transaction.delete(design_ref)
+
+
+async def _handle_create(request, current_user):
+    # Payload arrives already validated as DesignCreatePayload by the
+    # discriminated union, so there is no second parse here.
+    create_payload = request.payload
+
+    if not create_payload.cloth_purchase_id:
+        raise HTTPException(status_code=400, detail="cloth_purchase_id is required.")
+
+    cloth_purchase_ref = async_db.collection(CLOTH_COLLECTION).document(create_payload.cloth_purchase_id)
+
+    total_yards_for_design = create_payload.allocated_yards_per_piece * create_payload.number_of_pieces
+
+    # ✅ Multiply size_distribution quantities by number_of_pieces
+    multiplied_size_distribution = []
+    for item in create_payload.size_distribution:
+        multiplied_size_distribution.append({
+            "size": item.size,
+            "quantity": item.quantity * create_payload.number_of_pieces
+        })
+
+    # ✅ Build design data
+    design_data = Design(
+        design_code=create_payload.design_code,
+        cloth_purchase_id=create_payload.cloth_purchase_id,
+        allocated_yards=total_yards_for_design,
+        size_distribution=multiplied_size_distribution
+    ).model_dump()
+
+    design_data['created_at'] = datetime.utcnow()
+
+    # Denormalized aggregates: the production router reads these on every
+    # ironing completion instead of re-deriving them from the distribution.
+    denormalized_map = _size_map(design_data.get('size_distribution'))
+    design_data['size_map'] = denormalized_map
+    design_data['total_units'] = sum(denormalized_map.values())
+
+    # Automatically start the cutting process
+    tracking_now = datetime.utcnow()
+    tracking_data = {
+        "design_id": None,
+        "stage": ProductionStage.CUTTING.value,
+        "status": ProductionStatus.IN_PROGRESS.value,
+        "stages": {
+            ProductionStage.CUTTING.value: {
+                "status": ProductionStatus.IN_PROGRESS.value,
+                "arrived_at": tracking_now,
+                "completed_at": None,
+            },
+            ProductionStage.SEWING.value: {
+                "status": ProductionStatus.PENDING.value,
+                "arrived_at": None,
+                "completed_at": None,
+            },
+            ProductionStage.IRONING.value: {
+                "status": ProductionStatus.PENDING.value,
+                "arrived_at": None,
+                "completed_at": None,
+            },
+        },
+        "arrived_at": tracking_now,
+        "completed_at": None,
+        "created_at": tracking_now,
+        "updated_at": tracking_now,
+    }
+
+    # Pre-allocate both document IDs so the response can include them
+    # and everything commits in a single transaction.
+    doc_ref = async_db.collection(DESIGN_COLLECTION).document()
+    tracking_ref = async_db.collection(PRODUCTION_COLLECTION).document()
+    totals_ref = async_db.collection(DESIGN_TOTALS_COLLECTION).document(create_payload.design_code)
+    tracking_data["design_id"] = doc_ref.id
+
+    await _create_design_in_transaction(
+        async_db.transaction(), cloth_purchase_ref, doc_ref, tracking_ref,
+        totals_ref, design_data, tracking_data, total_yards_for_design
+    )
+
+    # Clear any cached negative lookup for the freshly minted id.
+    design_cache.invalidate(doc_ref.id)
+
+    created_design = design_data
+    created_design['id'] = doc_ref.id
+    created_design['tracking_id'] = tracking_ref.id
+    return created_design
+
+
+async def _handle_read_all(request, current_user):
+    designs = []
+    docs = async_db.collection(DESIGN_COLLECTION).stream()
+    async for doc in docs:
+        design_data = doc.to_dict()
+        design_data['id'] = doc.id
+        designs.append(design_data)
+    return designs
+
+
+async def _handle_read(request, current_user):
+    doc_ref = async_db.collection(DESIGN_COLLECTION).document(request.design_id)
+    doc = await doc_ref.get()
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="Design not found")
+    design_data = doc.to_dict()
+    design_data['id'] = doc.id
+    return design_data
+
+
+async def _handle_update(request, current_user):
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
+    update_data = request.payload.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No valid fields to update in payload.")
+
+    # The transaction re-reads the design (404s if missing) and the cloth
+    # purchase, so a failed yard check simply aborts instead of needing
+    # manual reverts — no separate existence pre-read required.
+    doc_ref = async_db.collection(DESIGN_COLLECTION).document(request.design_id)
+    design_data = await _update_design_in_transaction(
+        async_db.transaction(), doc_ref, async_db.collection(CLOTH_COLLECTION),
+        async_db.collection(DESIGN_TOTALS_COLLECTION), update_data
+    )
+
+    design_cache.invalidate(request.design_id)
+
+    # The transaction returns the pre-update document, so the response is
+    # just that merged with the applied changes — no re-read round trip.
+    return {**design_data, **update_data, 'id': doc_ref.id}
+
+
+async def _handle_delete(request, current_user):
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
+    design_id = request.design_id
+    doc_ref = async_db.collection(DESIGN_COLLECTION).document(design_id)
+    # Returning the yards and removing the design commit atomically; the
+    # transaction itself 404s when the design does not exist.
+    await _delete_design_in_transaction(
+        async_db.transaction(), doc_ref, async_db.collection(CLOTH_COLLECTION),
+        async_db.collection(DESIGN_TOTALS_COLLECTION)
+    )
+    design_cache.invalidate(design_id)
+
+    # The tracking query and the inventory lookup are independent, so
+    # issue them concurrently and then fan out the deletes the same way.
+    production_query = async_db.collection(PRODUCTION_COLLECTION).where(filter=FieldFilter('design_id', '==', design_id))
+    inventory_ref = async_db.collection(INVENTORY_COLLECTION).document(design_id)
+    production_docs, inventory_doc = await asyncio.gather(
+        production_query.get(), inventory_ref.get()
+    )
+
+    deletes = [prod_doc.reference.delete() for prod_doc in production_docs]
+    if inventory_doc.exists:
+        deletes.append(inventory_ref.delete())
+    if deletes:
+        await asyncio.gather(*deletes)
+
+    return {"status": "success", "message": f"Design {design_id} and all its production processes have been deleted."}
+
+
+async def _handle_get_totals(request, current_user):
+    design_code = request.payload.design_code
+
+    # The totals are maintained incrementally on every design mutation, so
+    # the common case is a single point read of the counter document.
+    totals_doc = await async_db.collection(DESIGN_TOTALS_COLLECTION).document(design_code).get()
+    if totals_doc.exists:
+        size_totals = {
+            size: quantity
+            for size, quantity in (totals_doc.to_dict().get('size_totals') or {}).items()
+            if quantity > 0
+        }
+        return {"design_code": design_code, "size_totals": size_totals}
+
+    # Fallback for design codes created before the counter documents
+    # existed: aggregate the matching designs in fixed-size batches of
+    # 500 so each round trip fetches a full page instead of trickling
+    # documents through the stream.
+    base_query = async_db.collection(DESIGN_COLLECTION).where(filter=FieldFilter('design_code', '==', design_code))
+    size_totals = Counter()
+    last_doc = None
+    while True:
+        query = base_query.limit(500)
+        if last_doc is not None:
+            query = query.start_after(last_doc)
+        batch = await query.get()
+        for doc in batch:
+            design_data = doc.to_dict()
+            size_totals.update(
+                {
+                    size_info['size']: size_info['quantity']
+                    for size_info in design_data.get('size_distribution', [])
+                    if size_info.get('size') and size_info.get('quantity')
+                }
+            )
+        if len(batch) < 500:
+            break
+        last_doc = batch[-1]
+
+    return {"design_code": design_code, "size_totals": dict(size_totals)}
+
+
+# Single C-level dict lookup per request instead of a cascade of string
+# comparisons down the handler body.
+_ACTIONS = {
+    "CREATE": _handle_create,
+    "READ": _handle_read,
+    "READ_ALL": _handle_read_all,
+    "UPDATE": _handle_update,
+    "DELETE": _handle_delete,
+    "GET_TOTALS": _handle_get_totals,
+}
 
 
 @router.post("/operate", response_model=Any, status_code=status.HTTP_200_OK)
-def operate_design(
+async def operate_design(
     request: DesignOperationRequest,
     current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
 ):
@@ -33,214 +373,7 @@ def operate_design(
     - DELETE
     - GET_TOTALS
     """
-    action = request.action
-    design_id = request.design_id
-    payload = request.payload
-
-    # --- CREATE Operation ---
-    if action == "CREATE":
-        if not payload:
-            raise HTTPException(status_code=400, detail="Payload required for CREATE action.")
-        try:
-            create_payload = DesignCreatePayload(**payload)
-
-            if not create_payload.cloth_purchase_id:
-                raise HTTPException(status_code=400, detail="cloth_purchase_id is required.")
-            
-            # Check cloth purchase and available yards
-            cloth_purchase_ref = db.collection(CLOTH_COLLECTION).document(create_payload.cloth_purchase_id)
-            cloth_purchase_doc = cloth_purchase_ref.get()
-
-            if not cloth_purchase_doc.exists:
-                raise HTTPException(status_code=404, detail="Cloth purchase not found.")
-
-            cloth_purchase_data = cloth_purchase_doc.to_dict()
-            
-            total_yards_for_design = create_payload.allocated_yards_per_piece * create_payload.number_of_pieces
-
-            if cloth_purchase_data['total_yards'] < total_yards_for_design:
-                raise HTTPException(status_code=400, detail="Not enough yards in the cloth purchase.")
-            
-            # ✅ Multiply size_distribution quantities by number_of_pieces
-            multiplied_size_distribution = []
-            for item in create_payload.size_distribution:
-                multiplied_size_distribution.append({
-                    "size": item.size,
-                    "quantity": item.quantity * create_payload.number_of_pieces
-                })
-            
-            # ✅ Build design data
-            design_data = Design(
-                design_code=create_payload.design_code,
-                cloth_purchase_id=create_payload.cloth_purchase_id,
-                allocated_yards=total_yards_for_design,
-                size_distribution=multiplied_size_distribution
-            ).model_dump()
-            
-            design_data['created_at'] = datetime.utcnow()
-            _, doc_ref = db.collection(DESIGN_COLLECTION).add(design_data)
-            
-            # Update cloth purchase with reduced yards
-            new_total_yards = cloth_purchase_data['total_yards'] - total_yards_for_design
-            cloth_purchase_ref.update({"total_yards": new_total_yards})
-
-            # Automatically start the cutting process
-            tracking_now = datetime.utcnow()
-            tracking_data = {
-                "design_id": doc_ref.id,
-                "stage": ProductionStage.CUTTING.value,
-                "status": ProductionStatus.IN_PROGRESS.value,
-                "stages": {
-                    ProductionStage.CUTTING.value: {
-                        "status": ProductionStatus.IN_PROGRESS.value,
-                        "arrived_at": tracking_now,
-                        "completed_at": None,
-                    },
-                    ProductionStage.SEWING.value: {
-                        "status": ProductionStatus.PENDING.value,
-                        "arrived_at": None,
-                        "completed_at": None,
-                    },
-                    ProductionStage.IRONING.value: {
-                        "status": ProductionStatus.PENDING.value,
-                        "arrived_at": None,
-                        "completed_at": None,
-                    },
-                },
-                "arrived_at": tracking_now,
-                "completed_at": None,
-                "created_at": tracking_now,
-                "updated_at": tracking_now,
-            }
-            tracking_ref = db.collection(PRODUCTION_COLLECTION).document()
-            tracking_ref.set(tracking_data)
-
-            created_design = design_data
-            created_design['id'] = doc_ref.id
-            created_design['tracking_id'] = tracking_ref.id
-            return created_design
-
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for creating design: {e}")
-
-    # --- READ_ALL Operation ---
-    if action == "READ_ALL":
-        designs = []
-        docs = db.collection(DESIGN_COLLECTION).stream()
-        for doc in docs:
-            design_data = doc.to_dict()
-            design_data['id'] = doc.id
-            designs.append(design_data)
-        return designs
-
-    # --- Common ID Validation ---
-    if not design_id and action in ["READ", "UPDATE", "DELETE"]:
-        raise HTTPException(status_code=400, detail=f"design_id is required for {action} action.")
-
-    if design_id:
-        doc_ref = db.collection(DESIGN_COLLECTION).document(design_id)
-        doc = doc_ref.get()
-        if not doc.exists and action in ["READ", "UPDATE", "DELETE"]:
-            raise HTTPException(status_code=404, detail="Design not found")
-
-    # --- READ (Single) Operation ---
-    if action == "READ":
-        design_data = doc.to_dict()
-        design_data['id'] = doc.id
-        return design_data
-
-    # --- UPDATE Operation ---
-    if action == "UPDATE":
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
-        if not payload:
-            raise HTTPException(status_code=400, detail="Payload required for UPDATE action.")
-        try:
-            update_data = DesignUpdate(**payload).model_dump(exclude_unset=True)
-            if not update_data:
-                raise HTTPException(status_code=400, detail="No valid fields to update in payload.")
-
-            design_data = doc.to_dict()
-            original_allocated_yards = design_data.get('allocated_yards', 0)
-
-            # Update design document
-            doc_ref.update(update_data)
-            
-            if 'allocated_yards' in update_data:
-                new_allocated_yards = update_data['allocated_yards']
-                yardage_difference = new_allocated_yards - original_allocated_yards
-                
-                cloth_purchase_ref = db.collection(CLOTH_COLLECTION).document(design_data['cloth_purchase_id'])
-                cloth_purchase_doc = cloth_purchase_ref.get()
-                
-                if not cloth_purchase_doc.exists:
-                    # Revert the design update if the cloth purchase is not found
-                    doc_ref.update({'allocated_yards': original_allocated_yards})
-                    raise HTTPException(status_code=404, detail="Cloth purchase not found.")
-                
-                cloth_purchase_data = cloth_purchase_doc.to_dict()
-                new_total_yards = cloth_purchase_data['total_yards'] - yardage_difference
-                
-                if new_total_yards < 0:
-                    # Revert if not enough yards
-                    doc_ref.update({'allocated_yards': original_allocated_yards})
-                    raise HTTPException(status_code=400, detail="Not enough yards in the cloth purchase.")
-
-                cloth_purchase_ref.update({"total_yards": new_total_yards})
-
-            updated_doc = doc_ref.get()
-            response_data = updated_doc.to_dict()
-            response_data['id'] = updated_doc.id
-            return response_data
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for updating design: {e}")
-
-    # --- DELETE Operation ---
-    if action == "DELETE":
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
-        design_data = doc.to_dict()
-        original_allocated_yards = design_data.get('allocated_yards', 0)
-        
-        cloth_purchase_ref = db.collection(CLOTH_COLLECTION).document(design_data['cloth_purchase_id'])
-        cloth_purchase_doc = cloth_purchase_ref.get()
-        
-        if cloth_purchase_doc.exists:
-            cloth_purchase_data = cloth_purchase_doc.to_dict()
-            new_total_yards = cloth_purchase_data['total_yards'] + original_allocated_yards
-            cloth_purchase_ref.update({"total_yards": new_total_yards})
-
-        # Delete associated production tracking documents
-        production_docs = db.collection(PRODUCTION_COLLECTION).where(filter=FieldFilter('design_id', '==', design_id)).stream()
-        for prod_doc in production_docs:
-            prod_doc.reference.delete()
-
-        # Remove inventory record if present
-        inventory_ref = db.collection(INVENTORY_COLLECTION).document(design_id)
-        if inventory_ref.get().exists:
-            inventory_ref.delete()
-
-        doc_ref.delete()
-        return {"status": "success", "message": f"Design {design_id} and all its production processes have been deleted."}
-
-    # --- GET_TOTALS Operation ---
-    if action == "GET_TOTALS":
-        if not payload or 'design_code' not in payload:
-            raise HTTPException(status_code=400, detail="design_code is required for GET_TOTALS action.")
-        
-        design_code = payload['design_code']
-        docs = db.collection(DESIGN_COLLECTION).where(filter=FieldFilter('design_code', '==', design_code)).stream()
-        
-        size_totals = {}
-        for doc in docs:
-            design_data = doc.to_dict()
-            for size_info in design_data.get('size_distribution', []):
-                size = size_info.get('size')
-                quantity = size_info.get('quantity')
-                if size and quantity:
-                    size_totals[size] = size_totals.get(size, 0) + quantity
-        
-        return {"design_code": design_code, "size_totals": size_totals}
-
-    # --- Invalid Action ---
-    raise HTTPException(status_code=400, detail="Invalid action specified.")
+    handler = _ACTIONS.get(request.action)
+    if handler is None:
+        raise HTTPException(status_code=400, detail="Invalid action specified.")
+    return await handler(request, current_user)
@@ -1,107 +1,147 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.auth import get_current_user_with_access
 from app.models.expense import (
     ExpenseCreate,
     ExpenseCrudAction,
     ExpenseOperationRequest,
-    ExpenseResponse,
     ExpenseUpdate,
 )
 from app.models.user import AccessLevel
-from app.services.firebase_service import EXPENSES_COLLECTION, db
+from app.responses import ORJSONResponse
+from app.services import doc_cache
+from app.services.firebase_service import EXPENSES_COLLECTION, async_db
 
 
 router = APIRouter(
     prefix="/expenses",
     tags=["Expense Operations"],
+    default_response_class=ORJSONResponse,
 )
 
+# Validators built once at import; validate_python reuses the compiled
+# pydantic-core schema instead of rebuilding validation state per call.
+_EXPENSE_CREATE_TA = TypeAdapter(ExpenseCreate)
+_EXPENSE_UPDATE_TA = TypeAdapter(ExpenseUpdate)
+
+_EXPENSES_COL = async_db.collection(EXPENSES_COLLECTION)
+
+_REQUIRE_L1 = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
+
+_ERR_FORBIDDEN = HTTPException(status_code=403, detail="You do not have permission to perform this action.")
+_ERR_NOT_FOUND = HTTPException(status_code=404, detail="Expense not found.")
+_ERR_CREATE_PAYLOAD = HTTPException(status_code=400, detail="Payload required for CREATE action.")
+_ERR_UPDATE_PAYLOAD = HTTPException(status_code=400, detail="Payload required for UPDATE action.")
+_ERR_NO_FIELDS = HTTPException(status_code=400, detail="No valid fields to update in payload.")
+_ERR_BAD_ACTION = HTTPException(status_code=400, detail="Invalid action specified.")
+
+
+async def _get_expense_or_404(expense_id, action):
+    if not expense_id:
+        raise HTTPException(status_code=400, detail=f"expense_id is required for {action.value} action.")
+    doc_ref = _EXPENSES_COL.document(expense_id)
+    doc = await doc_ref.get()
+    if not doc.exists:
+        raise _ERR_NOT_FOUND
+    return doc_ref, doc
+
+
+async def _create_expense(request, current_user):
+    payload = request.payload
+    if not payload:
+        raise _ERR_CREATE_PAYLOAD
+    try:
+        # The dump is already a fresh dict owned by this request, so set
+        # the timestamps in place instead of splatting into another dict.
+        expense_data = _EXPENSE_CREATE_TA.validate_python(payload).model_dump()
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payload for creating expense: {e}")
+    expense_data["created_at"] = datetime.now(timezone.utc)
+    expense_data["updated_at"] = None
+    _, doc_ref = await _EXPENSES_COL.add(expense_data)
+    # expense_data came out of a validated ExpenseCreate moments ago,
+    # so re-validating it through ExpenseResponse is pure overhead.
+    return {"id": doc_ref.id, **expense_data}
+
+
+async def _read_all_expenses(request, current_user):
+    docs = await _EXPENSES_COL.get()
+    expenses = [{**doc.to_dict(), "id": doc.id} for doc in docs]
+    return ORJSONResponse(expenses)
+
+
+async def _read_expense(request, current_user):
+    expense_id = request.expense_id
+    if expense_id:
+        cached = doc_cache.get(EXPENSES_COLLECTION, expense_id)
+        if cached is not None:
+            return cached
+    _, doc = await _get_expense_or_404(expense_id, request.action)
+    expense_data = doc.to_dict()
+    expense_data["id"] = doc.id
+    doc_cache.put(EXPENSES_COLLECTION, expense_id, expense_data)
+    return expense_data
+
+
+async def _update_expense(request, current_user):
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise _ERR_FORBIDDEN
+    payload = request.payload
+    if not payload:
+        raise _ERR_UPDATE_PAYLOAD
+    try:
+        # Validate through the cached adapter, then pull just the fields
+        # the client actually sent — a dict comprehension over
+        # model_fields_set beats the full model_dump serializer walk for
+        # this shallow three-field schema.
+        validated = _EXPENSE_UPDATE_TA.validate_python(payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payload for updating expense: {e}")
+    update_payload = {name: getattr(validated, name) for name in validated.model_fields_set}
+    if not update_payload:
+        raise _ERR_NO_FIELDS
+
+    doc_ref, doc = await _get_expense_or_404(request.expense_id, request.action)
+    update_payload["updated_at"] = datetime.now(timezone.utc)
+    await doc_ref.update(update_payload)
+    # The pre-update snapshot plus the applied changes is the new
+    # document state, so skip the read-back round trip.
+    response_data = {**doc.to_dict(), **update_payload, "id": request.expense_id}
+    doc_cache.put(EXPENSES_COLLECTION, request.expense_id, response_data)
+    return response_data
+
+
+async def _delete_expense(request, current_user):
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise _ERR_FORBIDDEN
+    doc_ref, _ = await _get_expense_or_404(request.expense_id, request.action)
+    await doc_ref.delete()
+    doc_cache.invalidate(EXPENSES_COLLECTION, request.expense_id)
+    return {"status": "success", "message": f"Expense {request.expense_id} deleted."}
+
+
+_DISPATCH = {
+    ExpenseCrudAction.CREATE: _create_expense,
+    ExpenseCrudAction.READ: _read_expense,
+    ExpenseCrudAction.READ_ALL: _read_all_expenses,
+    ExpenseCrudAction.UPDATE: _update_expense,
+    ExpenseCrudAction.DELETE: _delete_expense,
+}
+
 
 @router.post("/operate", response_model=Any, status_code=status.HTTP_200_OK)
-def operate_expense(
+async def operate_expense(
     request: ExpenseOperationRequest,
-    current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1)),
+    current_user: dict = _REQUIRE_L1,
 ):
     """
     Unified endpoint handling CRUD operations for expenses.
     """
-    action = request.action
-    expense_id = request.expense_id
-    payload = request.payload
-
-    # --- CREATE Operation ---
-    if action == ExpenseCrudAction.CREATE:
-        if not payload:
-            raise HTTPException(status_code=400, detail="Payload required for CREATE action.")
-        try:
-            create_payload = ExpenseCreate(**payload).model_dump()
-            expense_data = {
-                **create_payload,
-                "created_at": datetime.utcnow(),
-                "updated_at": None,
-            }
-            _, doc_ref = db.collection(EXPENSES_COLLECTION).add(expense_data)
-            created_expense: ExpenseResponse = ExpenseResponse(id=doc_ref.id, **expense_data)
-            return created_expense.model_dump()
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for creating expense: {e}")
-
-    # --- READ_ALL Operation ---
-    if action == ExpenseCrudAction.READ_ALL:
-        expenses = []
-        docs = db.collection(EXPENSES_COLLECTION).stream()
-        for doc in docs:
-            expense_data = doc.to_dict()
-            expense_data["id"] = doc.id
-            expenses.append(expense_data)
-        return expenses
-
-    # --- Common ID Validation ---
-    if action in {ExpenseCrudAction.READ, ExpenseCrudAction.UPDATE, ExpenseCrudAction.DELETE}:
-        if not expense_id:
-            raise HTTPException(status_code=400, detail=f"expense_id is required for {action.value} action.")
-        doc_ref = db.collection(EXPENSES_COLLECTION).document(expense_id)
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Expense not found.")
-    else:
-        doc_ref = doc = None  # type: ignore
-
-    # --- READ (Single) Operation ---
-    if action == ExpenseCrudAction.READ:
-        expense_data = doc.to_dict()
-        expense_data["id"] = doc.id
-        return expense_data
-
-    # --- UPDATE Operation ---
-    if action == ExpenseCrudAction.UPDATE:
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action.")
-        if not payload:
-            raise HTTPException(status_code=400, detail="Payload required for UPDATE action.")
-        try:
-            update_payload = ExpenseUpdate(**payload).model_dump(exclude_unset=True)
-            if not update_payload:
-                raise HTTPException(status_code=400, detail="No valid fields to update in payload.")
-            update_payload["updated_at"] = datetime.utcnow()
-            doc_ref.update(update_payload)
-            updated_doc = doc_ref.get()
-            response_data = updated_doc.to_dict()
-            response_data["id"] = updated_doc.id
-            return response_data
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for updating expense: {e}")
-
-    # --- DELETE Operation ---
-    if action == ExpenseCrudAction.DELETE:
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action.")
-        doc_ref.delete()
-        return {"status": "success", "message": f"Expense {expense_id} deleted."}
-
-    raise HTTPException(status_code=400, detail="Invalid action specified.")
+    handler = _DISPATCH.get(request.action)
+    if handler is None:
+        raise _ERR_BAD_ACTION
+    return await handler(request, current_user)
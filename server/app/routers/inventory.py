@@ -3,42 +3,57 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from app.auth import get_current_user_with_access
 from app.models.inventory import InventoryAction, InventoryOperationRequest
 from app.models.user import AccessLevel
-from app.services.firebase_service import db, INVENTORY_COLLECTION
+from app.responses import ORJSONResponse
+from app.services.firebase_service import async_db, INVENTORY_COLLECTION
 
 router = APIRouter(
     prefix="/inventory",
-    tags=["Inventory"]
+    tags=["Inventory"],
+    default_response_class=ORJSONResponse
 )
 
+_INVENTORY_COL = async_db.collection(INVENTORY_COLLECTION)
+
+_REQUIRE_L1 = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
+
+_ERR_DESIGN_ID_REQUIRED = HTTPException(status_code=400, detail="design_id is required for GET_BY_DESIGN.")
+_ERR_NOT_FOUND = HTTPException(status_code=404, detail="Inventory record not found for the design.")
+_ERR_BAD_ACTION = HTTPException(status_code=400, detail="Invalid inventory action provided.")
+
+
+async def _read_all_inventory(request, current_user):
+    docs = await _INVENTORY_COL.get()
+    inventory = [{**doc.to_dict(), "id": doc.id} for doc in docs]
+    return ORJSONResponse(inventory)
+
+
+async def _get_inventory_by_design(request, current_user):
+    design_id = request.design_id
+    if not design_id:
+        raise _ERR_DESIGN_ID_REQUIRED
+
+    doc_ref = _INVENTORY_COL.document(design_id)
+    doc = await doc_ref.get()
+    if not doc.exists:
+        raise _ERR_NOT_FOUND
+
+    record = doc.to_dict()
+    record["id"] = doc.id
+    return record
+
+
+_DISPATCH = {
+    InventoryAction.READ_ALL: _read_all_inventory,
+    InventoryAction.GET_BY_DESIGN: _get_inventory_by_design,
+}
+
 
 @router.post("/operate", status_code=status.HTTP_200_OK)
-def operate_inventory(
+async def operate_inventory(
     request: InventoryOperationRequest,
-    current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
+    current_user: dict = _REQUIRE_L1
 ):
-    action = request.action
-    design_id = request.design_id
-
-    if action == InventoryAction.READ_ALL:
-        docs = db.collection(INVENTORY_COLLECTION).stream()
-        inventory = []
-        for doc in docs:
-            record = doc.to_dict()
-            record["id"] = doc.id
-            inventory.append(record)
-        return inventory
-
-    if action == InventoryAction.GET_BY_DESIGN:
-        if not design_id:
-            raise HTTPException(status_code=400, detail="design_id is required for GET_BY_DESIGN.")
-
-        doc_ref = db.collection(INVENTORY_COLLECTION).document(design_id)
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Inventory record not found for the design.")
-
-        record = doc.to_dict()
-        record["id"] = doc.id
-        return record
-
-    raise HTTPException(status_code=400, detail="Invalid inventory action provided.")
+    handler = _DISPATCH.get(request.action)
+    if handler is None:
+        raise _ERR_BAD_ACTION
+    return await handler(request, current_user)
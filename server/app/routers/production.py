@@ -1,6 +1,9 @@
+import asyncio
+from collections import Counter
+
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import Any, Dict
-from datetime import datetime
+from typing import Any, Dict, Tuple
+from datetime import datetime, timezone
 
 from app.models.production import (
     ProductionOperationRequest,
@@ -9,507 +12,680 @@ from app.models.production import (
     ProductionStatus,
 )
 from app.services.firebase_service import (
-    db,
+    async_db,
     PRODUCTION_COLLECTION,
     DESIGN_COLLECTION,
     INVENTORY_COLLECTION,
 )
 from app.auth import get_current_user_with_access
 from app.models.user import AccessLevel
+from app.services import cache, design_cache
+from app.responses import ORJSONResponse
+from google.cloud import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
 
 router = APIRouter(
     prefix="/production",
-    tags=["Production Tracking"]
+    tags=["Production Tracking"],
+    default_response_class=ORJSONResponse
 )
 
+# Collection handles are stateless; resolve them once instead of allocating
+# a CollectionReference per request. The async client itself is the shared
+# per-process singleton from firebase_service.
+_PRODUCTION_COL = async_db.collection(PRODUCTION_COLLECTION)
+_DESIGN_COL = async_db.collection(DESIGN_COLLECTION)
+_INVENTORY_COL = async_db.collection(INVENTORY_COLLECTION)
+
+# Listing endpoints only need the tracking summary fields; projecting
+# them keeps the nested stages map and other bulk off the wire.
+_LISTING_FIELDS = ["design_id", "stage", "status", "arrived_at", "completed_at", "updated_at"]
+
+# Sort fallback for the rare record without an updated_at stamp.
+_EPOCH_MIN = datetime(1, 1, 1, tzinfo=timezone.utc)
+
 STAGE_SEQUENCE = [
     ProductionStage.CUTTING,
     ProductionStage.SEWING,
     ProductionStage.IRONING,
 ]
 
+# O(1) revert lookups for DELETE: stage value string -> ordinal and
+# previous stage value, instead of constructing the enum and scanning
+# STAGE_SEQUENCE on every call.
+_STAGE_INDEX = {stage.value: index for index, stage in enumerate(STAGE_SEQUENCE)}
+_PREV_STAGE = {
+    stage.value: STAGE_SEQUENCE[index - 1].value
+    for index, stage in enumerate(STAGE_SEQUENCE)
+    if index > 0
+}
+
+# Enum .value lookups resolved once; the handlers build a lot of update
+# payloads out of these strings.
+_CUTTING = ProductionStage.CUTTING.value
+_SEWING = ProductionStage.SEWING.value
+_IRONING = ProductionStage.IRONING.value
+_PENDING = ProductionStatus.PENDING.value
+_IN_PROGRESS = ProductionStatus.IN_PROGRESS.value
+_COMPLETED = ProductionStatus.COMPLETED.value
+
+# Template for a stage that has not started; copied per record.
+_PENDING_STAGE = {"status": _PENDING, "arrived_at": None, "completed_at": None}
+
+# Dotted stage field paths built once at import; handlers compose update
+# payloads from this table instead of re-interpolating strings per call.
+_STAGE_FIELDS = {
+    (stage.value, field): f"stages.{stage.value}.{field}"
+    for stage in ProductionStage
+    for field in ("status", "arrived_at", "completed_at")
+}
+
+
+def _reset_stage(stage_value: str) -> Dict[str, Any]:
+    """Update fragment returning a stage to its not-started state."""
+    return {
+        _STAGE_FIELDS[(stage_value, "status")]: _PENDING,
+        _STAGE_FIELDS[(stage_value, "arrived_at")]: None,
+        _STAGE_FIELDS[(stage_value, "completed_at")]: None,
+    }
 
-def _default_stage_payload() -> Dict[str, Dict[str, Any]]:
+
+def _default_stage_payload(now: datetime) -> Dict[str, Dict[str, Any]]:
     """Initialise stage metadata for a new tracking record."""
-    now = datetime.utcnow()
     return {
-        ProductionStage.CUTTING.value: {
-            "status": ProductionStatus.IN_PROGRESS.value,
+        _CUTTING: {
+            "status": _IN_PROGRESS,
             "arrived_at": now,
             "completed_at": None,
         },
-        ProductionStage.SEWING.value: {
-            "status": ProductionStatus.PENDING.value,
-            "arrived_at": None,
-            "completed_at": None,
-        },
-        ProductionStage.IRONING.value: {
-            "status": ProductionStatus.PENDING.value,
-            "arrived_at": None,
-            "completed_at": None,
-        },
+        _SEWING: dict(_PENDING_STAGE),
+        _IRONING: dict(_PENDING_STAGE),
     }
 
 
-def _get_tracking_by_design(design_id: str):
-    docs = db.collection(PRODUCTION_COLLECTION).where(
+def _apply_page(query, request):
+    """Order by recency and bound the page; resume after the cursor if given."""
+    query = query.order_by("updated_at", direction=firestore.Query.DESCENDING).limit(request.limit)
+    if request.cursor is not None:
+        query = query.start_after({"updated_at": request.cursor})
+    return query
+
+
+def _set_dotted(data: Dict[str, Any], key: str, value: Any):
+    """Apply a flattened Firestore field path ("stages.cutting.status") to a nested dict."""
+    if "." not in key:
+        data[key] = value
+        return
+    parts = key.split(".")
+    node = data
+    for part in parts[:-1]:
+        child = node.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            node[part] = child
+        node = child
+    node[parts[-1]] = value
+
+
+def _tracking_response(doc_ref, prior_data: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the response by merging the applied updates into the snapshot we
+    already hold, avoiding a read-back round trip after every write.
+    """
+    data = dict(prior_data)
+    for key, value in updates.items():
+        _set_dotted(data, key, value)
+    data["id"] = doc_ref.id
+    return data
+
+
+@firestore.async_transactional
+async def _transition_in_transaction(transaction, doc_ref, not_found_detail, validate, updates):
+    """
+    Read, validate, and update a tracking record atomically. One commit
+    replaces the separate get() + update() pair, and concurrent stage
+    transitions can no longer interleave between the read and the write.
+    """
+    snap = await doc_ref.get(transaction=transaction)
+    if not snap.exists:
+        raise HTTPException(status_code=404, detail=not_found_detail)
+    tracking_data = snap.to_dict()
+    validate(tracking_data)
+    transaction.update(doc_ref, updates)
+    return tracking_data
+
+
+@firestore.async_transactional
+async def _complete_ironing_in_transaction(transaction, doc_ref, validate, updates):
+    """
+    Complete ironing and credit the produced units to inventory in one
+    atomic commit instead of a tracking update followed by a separate
+    inventory read-modify-write.
+    """
+    snap = await doc_ref.get(transaction=transaction)
+    if not snap.exists:
+        raise HTTPException(status_code=404, detail="Ironing tracking record not found.")
+    tracking_data = snap.to_dict()
+    validate(tracking_data)
+
+    inventory_ref = None
+    inventory_payload = None
+    design_id = tracking_data.get("design_id")
+    if design_id:
+        # Served from the design cache; the size map is static relative
+        # to this transition so a non-transactional read is fine.
+        size_map = await _get_design_size_map(design_id)
+        if size_map:
+            # Blind server-side increments: no inventory read needed, and
+            # merge=True creates the doc when it does not exist yet.
+            inventory_ref = _INVENTORY_COL.document(design_id)
+            inventory_payload = {
+                "design_id": design_id,
+                "sizes": {size: firestore.Increment(qty) for size, qty in size_map.items()},
+                "total_available": firestore.Increment(sum(size_map.values())),
+                # Inventory writes are not echoed back to the client, so
+                # the server-side sentinel is free of the local-merge
+                # constraint the tracking fields have.
+                "updated_at": firestore.SERVER_TIMESTAMP,
+            }
+
+    transaction.update(doc_ref, updates)
+    if inventory_payload is not None:
+        transaction.set(inventory_ref, inventory_payload, merge=True)
+    return tracking_data
+
+
+async def _get_tracking_by_design(design_id: str):
+    docs = await _PRODUCTION_COL.where(
         filter=FieldFilter("design_id", "==", design_id)
     ).limit(1).get()
     return docs[0] if docs else None
 
 
-def _get_tracking_by_id(tracking_id: str):
-    doc_ref = db.collection(PRODUCTION_COLLECTION).document(tracking_id)
-    doc = doc_ref.get()
+async def _get_tracking_by_id(tracking_id: str):
+    doc_ref = _PRODUCTION_COL.document(tracking_id)
+    doc = await doc_ref.get()
     if not doc.exists:
         raise HTTPException(status_code=404, detail="Tracking record not found.")
     return doc_ref, doc
 
 
 def _ensure_cutting_completed(stage_data: Dict[str, Any]):
-    cutting_data = stage_data.get(ProductionStage.CUTTING.value, {})
-    if cutting_data.get("status") != ProductionStatus.COMPLETED.value:
+    cutting_data = stage_data.get(_CUTTING, {})
+    if cutting_data.get("status") != _COMPLETED:
         raise HTTPException(status_code=400, detail="Cannot proceed: Cutting stage not completed.")
 
 
 def _ensure_sewing_completed(stage_data: Dict[str, Any]):
-    sewing_data = stage_data.get(ProductionStage.SEWING.value, {})
-    if sewing_data.get("status") != ProductionStatus.COMPLETED.value:
+    sewing_data = stage_data.get(_SEWING, {})
+    if sewing_data.get("status") != _COMPLETED:
         raise HTTPException(status_code=400, detail="Cannot proceed: Sewing stage not completed.")
 
 
-def _get_design_size_map(design_id: str) -> Dict[str, int]:
-    design_doc = db.collection(DESIGN_COLLECTION).document(design_id).get()
+async def _load_design(design_id: str) -> Tuple[bool, Dict[str, int]]:
+    """
+    Resolve (exists, size_map) for a design, serving repeat lookups from
+    the shared TTL cache. Only size_distribution is fetched on a miss.
+    """
+    cached = design_cache.get(design_id)
+    if cached is not None:
+        return cached
+
+    design_doc = await _DESIGN_COL.document(design_id).get(
+        field_paths=["size_map", "size_distribution"]
+    )
     if not design_doc.exists:
-        raise HTTPException(status_code=404, detail="Design not found for inventory update.")
+        design_cache.put(design_id, False, {})
+        return False, {}
+
     design_data = design_doc.to_dict()
-    distribution = design_data.get("size_distribution") or []
-    size_map: Dict[str, int] = {}
-    for entry in distribution:
-        size = entry.get("size")
-        quantity = int(entry.get("quantity", 0))
-        if not size:
-            continue
-        size_map[size] = size_map.get(size, 0) + quantity
+    stored_map = design_data.get("size_map")
+    if stored_map:
+        # Denormalized by the design router on create/update.
+        size_map = {size: int(qty) for size, qty in stored_map.items()}
+    else:
+        # Older design docs only carry the raw distribution; Counter
+        # accumulation stays on the C-level dict fast path.
+        totals: Counter = Counter()
+        for entry in design_data.get("size_distribution") or []:
+            size = entry.get("size")
+            if size:
+                totals[size] += int(entry.get("quantity") or 0)
+        size_map = dict(totals)
+    design_cache.put(design_id, True, size_map)
+    return True, size_map
+
+
+async def _get_design_size_map(design_id: str) -> Dict[str, int]:
+    exists, size_map = await _load_design(design_id)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Design not found for inventory update.")
     return size_map
 
 
-def _adjust_inventory(design_id: str, multiplier: int):
+@firestore.async_transactional
+async def _revert_inventory_in_transaction(transaction, doc_ref, size_map, multiplier):
+    """
+    Subtract a design's units from inventory with the negative-stock guard
+    evaluated against a transactional read, so a concurrent sale or credit
+    cannot slip between the check and the write.
+    """
+    doc = await doc_ref.get(transaction=transaction)
+    if not doc.exists:
+        raise HTTPException(status_code=400, detail="Cannot subtract from inventory that does not exist.")
+
+    data = doc.to_dict()
+    current_sizes = data.get("sizes", {})
+    updated_sizes: Dict[str, int] = {}
+    for size, base_qty in size_map.items():
+        new_qty = int(current_sizes.get(size, 0)) + base_qty * multiplier
+        if new_qty < 0:
+            raise HTTPException(status_code=400, detail="Inventory cannot go below zero for size {}".format(size))
+        updated_sizes[size] = new_qty
+
+    # preserve any extra sizes that are not part of the current design distribution
+    for size, qty in current_sizes.items():
+        if size not in updated_sizes:
+            updated_sizes[size] = int(qty)
+
+    new_total = int(data.get("total_available", 0)) + sum(size_map.values()) * multiplier
+    if new_total < 0:
+        raise HTTPException(status_code=400, detail="Inventory cannot be negative.")
+
+    transaction.update(doc_ref, {
+        "sizes": updated_sizes,
+        "total_available": new_total,
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    })
+
+
+async def _adjust_inventory(design_id: str, multiplier: int):
     if multiplier == 0:
         return
 
-    size_map = _get_design_size_map(design_id)
+    size_map = await _get_design_size_map(design_id)
     if not size_map:
         return
 
-    total_delta = sum(size_map.values()) * multiplier
-    now = datetime.utcnow()
+    doc_ref = _INVENTORY_COL.document(design_id)
 
-    doc_ref = db.collection(INVENTORY_COLLECTION).document(design_id)
-    doc = doc_ref.get()
-
-    if doc.exists:
-        data = doc.to_dict()
-        current_sizes = data.get("sizes", {})
-        updated_sizes: Dict[str, int] = {}
-        for size, base_qty in size_map.items():
-            new_qty = int(current_sizes.get(size, 0)) + base_qty * multiplier
-            if new_qty < 0:
-                raise HTTPException(status_code=400, detail="Inventory cannot go below zero for size {}".format(size))
-            updated_sizes[size] = new_qty
-
-        # preserve any extra sizes that are not part of the current design distribution
-        for size, qty in current_sizes.items():
-            if size not in updated_sizes:
-                updated_sizes[size] = int(qty)
-
-        new_total = int(data.get("total_available", 0)) + total_delta
-        if new_total < 0:
-            raise HTTPException(status_code=400, detail="Inventory cannot be negative.")
-
-        doc_ref.update({
-            "sizes": updated_sizes,
-            "total_available": new_total,
-            "updated_at": now,
-        })
-    else:
-        if multiplier < 0:
-            raise HTTPException(status_code=400, detail="Cannot subtract from inventory that does not exist.")
-        doc_ref.set({
+    if multiplier > 0:
+        # Additions never need the negative guard: blind server-side
+        # increments skip the prior read and stay atomic under
+        # concurrency, with merge=True creating the doc when missing.
+        await doc_ref.set({
             "design_id": design_id,
-            "sizes": {size: int(qty) for size, qty in size_map.items()},
-            "total_available": sum(size_map.values()),
-            "created_at": now,
-            "updated_at": now,
-        })
+            "sizes": {size: firestore.Increment(qty * multiplier) for size, qty in size_map.items()},
+            "total_available": firestore.Increment(sum(size_map.values()) * multiplier),
+            "updated_at": firestore.SERVER_TIMESTAMP,
+        }, merge=True)
+        await cache.invalidate_inventory(design_id)
+        return
 
-@router.post("/operate", response_model=Any, status_code=status.HTTP_200_OK)
-def operate_production(
-    request: ProductionOperationRequest,
-    current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
-):
-    action = request.action
+    # Subtractions (the DELETE revert) keep the read-modify-write, but
+    # inside a transaction so the guard holds under contention.
+    await _revert_inventory_in_transaction(async_db.transaction(), doc_ref, size_map, multiplier)
+    await cache.invalidate_inventory(design_id)
+
+async def _handle_start_cutting(request, current_user, now):
     design_id = request.design_id
     tracking_id = request.tracking_id
-    now = datetime.utcnow()
-
-    def _tracking_response(doc_ref):
-        refreshed = doc_ref.get()
-        data = refreshed.to_dict()
-        data["id"] = doc_ref.id
-        return data
-
-    # --- START_CUTTING Operation ---
-    if action == CrudAction.START_CUTTING:
-        if not design_id and not tracking_id:
-            raise HTTPException(
-                status_code=400,
-                detail="design_id or tracking_id required for START_CUTTING action."
-            )
-
-        doc_ref = None
-
-        if tracking_id:
-            doc_ref, _ = _get_tracking_by_id(tracking_id)
-        else:
-            design_ref = db.collection(DESIGN_COLLECTION).document(design_id)
-            if not design_ref.get().exists:
-                raise HTTPException(status_code=404, detail="Design not found")
-
-            existing = _get_tracking_by_design(design_id)
-            if existing:
-                doc_ref = existing.reference
-
-        if doc_ref:
-            updates = {
-                "stage": ProductionStage.CUTTING.value,
-                "status": ProductionStatus.IN_PROGRESS.value,
-                "arrived_at": now,
-                "completed_at": None,
-                "stages.cutting.status": ProductionStatus.IN_PROGRESS.value,
-                "stages.cutting.arrived_at": now,
-                "stages.cutting.completed_at": None,
-                "stages.sewing.status": ProductionStatus.PENDING.value,
-                "stages.sewing.arrived_at": None,
-                "stages.sewing.completed_at": None,
-                "stages.ironing.status": ProductionStatus.PENDING.value,
-                "stages.ironing.arrived_at": None,
-                "stages.ironing.completed_at": None,
-                "updated_at": now,
-            }
-            doc_ref.update(updates)
-            return _tracking_response(doc_ref)
+    if not design_id and not tracking_id:
+        raise HTTPException(
+            status_code=400,
+            detail="design_id or tracking_id required for START_CUTTING action."
+        )
 
-        stage_payload = _default_stage_payload()
-        tracking_data = {
-            "design_id": design_id,
-            "stage": ProductionStage.CUTTING.value,
-            "status": ProductionStatus.IN_PROGRESS.value,
-            "stages": stage_payload,
+    doc_ref = None
+    prior_data: Dict[str, Any] = {}
+
+    if tracking_id:
+        doc_ref, snap = await _get_tracking_by_id(tracking_id)
+        prior_data = snap.to_dict()
+    else:
+        # Existence check and existing-tracking lookup are independent;
+        # run both round trips concurrently. The design side is served
+        # from the TTL cache on repeat hits.
+        (design_exists, _), existing = await asyncio.gather(
+            _load_design(design_id), _get_tracking_by_design(design_id)
+        )
+        if not design_exists:
+            raise HTTPException(status_code=404, detail="Design not found")
+
+        if existing:
+            doc_ref = existing.reference
+            prior_data = existing.to_dict()
+
+    if doc_ref:
+        updates = {
+            "stage": _CUTTING,
+            "status": _IN_PROGRESS,
             "arrived_at": now,
             "completed_at": None,
-            "created_at": now,
+            "stages.cutting.status": _IN_PROGRESS,
+            "stages.cutting.arrived_at": now,
+            "stages.cutting.completed_at": None,
+            **_reset_stage(_SEWING),
+            **_reset_stage(_IRONING),
             "updated_at": now,
         }
-        doc_ref = db.collection(PRODUCTION_COLLECTION).document()
-        doc_ref.set(tracking_data)
-        tracking_data["id"] = doc_ref.id
-        return tracking_data
-
-    # --- COMPLETE_CUTTING Operation ---
-    elif action == CrudAction.COMPLETE_CUTTING:
-        if not tracking_id:
-            raise HTTPException(status_code=400, detail="tracking_id is required for COMPLETE_CUTTING action.")
-        
-        doc_ref = db.collection(PRODUCTION_COLLECTION).document(tracking_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Cutting tracking record not found.")
-        
-        tracking_data = doc.to_dict()
-        if tracking_data.get("stage") != ProductionStage.CUTTING.value:
-            raise HTTPException(status_code=400, detail="This action is only for cutting stage.")
+        await doc_ref.update(updates)
+        return _tracking_response(doc_ref, prior_data, updates)
+
+    stage_payload = _default_stage_payload(now)
+    tracking_data = {
+        "design_id": design_id,
+        "stage": _CUTTING,
+        "status": _IN_PROGRESS,
+        "stages": stage_payload,
+        "arrived_at": now,
+        "completed_at": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    doc_ref = _PRODUCTION_COL.document()
+    await doc_ref.set(tracking_data)
+    tracking_data["id"] = doc_ref.id
+    return tracking_data
 
-        if tracking_data.get("status") != ProductionStatus.IN_PROGRESS.value:
-            raise HTTPException(status_code=400, detail="Cutting stage is not in progress.")
 
-        doc_ref.update({
-            "stage": ProductionStage.SEWING.value,
-            "status": ProductionStatus.PENDING.value,
-            "arrived_at": None,
-            "completed_at": None,
-            "stages.cutting.status": ProductionStatus.COMPLETED.value,
-            "stages.cutting.completed_at": now,
-            "stages.sewing.status": ProductionStatus.PENDING.value,
-            "stages.sewing.arrived_at": None,
-            "stages.sewing.completed_at": None,
-            "updated_at": now,
-        })
+async def _handle_complete_cutting(request, current_user, now):
+    if not request.tracking_id:
+        raise HTTPException(status_code=400, detail="tracking_id is required for COMPLETE_CUTTING action.")
+
+    doc_ref = _PRODUCTION_COL.document(request.tracking_id)
 
-        return _tracking_response(doc_ref)
+    def _validate(tracking_data):
+        if tracking_data.get("stage") != _CUTTING:
+            raise HTTPException(status_code=400, detail="This action is only for cutting stage.")
+        if tracking_data.get("status") != _IN_PROGRESS:
+            raise HTTPException(status_code=400, detail="Cutting stage is not in progress.")
+
+    updates = {
+        "stage": _SEWING,
+        "status": _PENDING,
+        "arrived_at": None,
+        "completed_at": None,
+        "stages.cutting.status": _COMPLETED,
+        "stages.cutting.completed_at": now,
+        **_reset_stage(_SEWING),
+        "updated_at": now,
+    }
+    tracking_data = await _transition_in_transaction(
+        async_db.transaction(), doc_ref, "Cutting tracking record not found.", _validate, updates
+    )
 
-    # --- START_SEWING Operation ---
-    elif action == CrudAction.START_SEWING:
-        if not tracking_id:
-            raise HTTPException(status_code=400, detail="tracking_id is required for START_SEWING action.")
+    return _tracking_response(doc_ref, tracking_data, updates)
 
-        doc_ref = db.collection(PRODUCTION_COLLECTION).document(tracking_id)
-        doc = doc_ref.get()
 
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Sewing tracking record not found.")
+async def _handle_start_sewing(request, current_user, now):
+    if not request.tracking_id:
+        raise HTTPException(status_code=400, detail="tracking_id is required for START_SEWING action.")
 
-        tracking_data = doc.to_dict()
+    doc_ref = _PRODUCTION_COL.document(request.tracking_id)
 
+    def _validate(tracking_data):
         stage_data = tracking_data.get("stages") or {}
         _ensure_cutting_completed(stage_data)
 
-        sewing_stage = stage_data.get(ProductionStage.SEWING.value, {})
+        sewing_stage = stage_data.get(_SEWING, {})
         current_stage = tracking_data.get("stage")
         current_status = tracking_data.get("status")
 
         allowed_state = (
-            (current_stage == ProductionStage.SEWING.value and current_status in {
-                ProductionStatus.PENDING.value,
-                ProductionStatus.COMPLETED.value,
+            (current_stage == _SEWING and current_status in {
+                _PENDING,
+                _COMPLETED,
             })
-            or (current_stage == ProductionStage.CUTTING.value and current_status == ProductionStatus.COMPLETED.value)
+            or (current_stage == _CUTTING and current_status == _COMPLETED)
         )
 
-        if sewing_stage.get("status") != ProductionStatus.PENDING.value or not allowed_state:
+        if sewing_stage.get("status") != _PENDING or not allowed_state:
             raise HTTPException(status_code=400, detail="Sewing stage is not ready to start.")
 
-        doc_ref.update({
-            "stage": ProductionStage.SEWING.value,
-            "status": ProductionStatus.IN_PROGRESS.value,
-            "arrived_at": now,
-            "completed_at": None,
-            "stages.sewing.status": ProductionStatus.IN_PROGRESS.value,
-            "stages.sewing.arrived_at": now,
-            "updated_at": now,
-        })
-
-        return _tracking_response(doc_ref)
-
-    # --- COMPLETE_SEWING Operation ---
-    elif action == CrudAction.COMPLETE_SEWING:
-        if not tracking_id:
-            raise HTTPException(status_code=400, detail="tracking_id is required for COMPLETE_SEWING action.")
-        
-        doc_ref = db.collection(PRODUCTION_COLLECTION).document(tracking_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Sewing tracking record not found.")
-        
-        tracking_data = doc.to_dict()
-        if tracking_data.get("stage") != ProductionStage.SEWING.value:
-            raise HTTPException(status_code=400, detail="This action is only for sewing stage.")
+    updates = {
+        "stage": _SEWING,
+        "status": _IN_PROGRESS,
+        "arrived_at": now,
+        "completed_at": None,
+        "stages.sewing.status": _IN_PROGRESS,
+        "stages.sewing.arrived_at": now,
+        "updated_at": now,
+    }
+    tracking_data = await _transition_in_transaction(
+        async_db.transaction(), doc_ref, "Sewing tracking record not found.", _validate, updates
+    )
+
+    return _tracking_response(doc_ref, tracking_data, updates)
+
 
-        if tracking_data.get("status") != ProductionStatus.IN_PROGRESS.value:
+async def _handle_complete_sewing(request, current_user, now):
+    if not request.tracking_id:
+        raise HTTPException(status_code=400, detail="tracking_id is required for COMPLETE_SEWING action.")
+
+    doc_ref = _PRODUCTION_COL.document(request.tracking_id)
+
+    def _validate(tracking_data):
+        if tracking_data.get("stage") != _SEWING:
+            raise HTTPException(status_code=400, detail="This action is only for sewing stage.")
+        if tracking_data.get("status") != _IN_PROGRESS:
             raise HTTPException(status_code=400, detail="Sewing stage is not in progress.")
-        
-        doc_ref.update({
-            "stage": ProductionStage.IRONING.value,
-            "status": ProductionStatus.PENDING.value,
-            "arrived_at": None,
-            "completed_at": None,
-            "stages.sewing.status": ProductionStatus.COMPLETED.value,
-            "stages.sewing.completed_at": now,
-            "stages.ironing.status": ProductionStatus.PENDING.value,
-            "stages.ironing.arrived_at": None,
-            "stages.ironing.completed_at": None,
-            "updated_at": now,
-        })
-        
-        return _tracking_response(doc_ref)
 
-    # --- START_IRONING Operation ---
-    elif action == CrudAction.START_IRONING:
-        if not tracking_id:
-            raise HTTPException(status_code=400, detail="tracking_id is required for START_IRONING action.")
+    updates = {
+        "stage": _IRONING,
+        "status": _PENDING,
+        "arrived_at": None,
+        "completed_at": None,
+        "stages.sewing.status": _COMPLETED,
+        "stages.sewing.completed_at": now,
+        **_reset_stage(_IRONING),
+        "updated_at": now,
+    }
+    tracking_data = await _transition_in_transaction(
+        async_db.transaction(), doc_ref, "Sewing tracking record not found.", _validate, updates
+    )
+
+    return _tracking_response(doc_ref, tracking_data, updates)
 
-        doc_ref = db.collection(PRODUCTION_COLLECTION).document(tracking_id)
-        doc = doc_ref.get()
 
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Ironing tracking record not found.")
+async def _handle_start_ironing(request, current_user, now):
+    if not request.tracking_id:
+        raise HTTPException(status_code=400, detail="tracking_id is required for START_IRONING action.")
 
-        tracking_data = doc.to_dict()
+    doc_ref = _PRODUCTION_COL.document(request.tracking_id)
 
+    def _validate(tracking_data):
         stage_data = tracking_data.get("stages") or {}
         _ensure_cutting_completed(stage_data)
         _ensure_sewing_completed(stage_data)
 
-        ironing_stage = stage_data.get(ProductionStage.IRONING.value, {})
+        ironing_stage = stage_data.get(_IRONING, {})
         current_stage = tracking_data.get("stage")
         current_status = tracking_data.get("status")
 
         allowed_state = (
-            (current_stage == ProductionStage.IRONING.value and current_status == ProductionStatus.PENDING.value)
-            or (current_stage == ProductionStage.SEWING.value and current_status == ProductionStatus.COMPLETED.value)
+            (current_stage == _IRONING and current_status == _PENDING)
+            or (current_stage == _SEWING and current_status == _COMPLETED)
         )
 
-        if ironing_stage.get("status") != ProductionStatus.PENDING.value or not allowed_state:
+        if ironing_stage.get("status") != _PENDING or not allowed_state:
             raise HTTPException(status_code=400, detail="Ironing stage is not ready to start.")
 
-        doc_ref.update({
-            "stage": ProductionStage.IRONING.value,
-            "status": ProductionStatus.IN_PROGRESS.value,
-            "arrived_at": now,
-            "completed_at": None,
-            "stages.ironing.status": ProductionStatus.IN_PROGRESS.value,
-            "stages.ironing.arrived_at": now,
-            "updated_at": now,
-        })
-        
-        return _tracking_response(doc_ref)
-
-    # --- COMPLETE_IRONING Operation ---
-    elif action == CrudAction.COMPLETE_IRONING:
-        if not tracking_id:
-            raise HTTPException(status_code=400, detail="tracking_id is required for COMPLETE_IRONING action.")
-        
-        doc_ref = db.collection(PRODUCTION_COLLECTION).document(tracking_id)
-        doc = doc_ref.get()
-        
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Ironing tracking record not found.")
-        
-        tracking_data = doc.to_dict()
-        if tracking_data.get("stage") != ProductionStage.IRONING.value:
-            raise HTTPException(status_code=400, detail="This action is only for ironing stage.")
+    updates = {
+        "stage": _IRONING,
+        "status": _IN_PROGRESS,
+        "arrived_at": now,
+        "completed_at": None,
+        "stages.ironing.status": _IN_PROGRESS,
+        "stages.ironing.arrived_at": now,
+        "updated_at": now,
+    }
+    tracking_data = await _transition_in_transaction(
+        async_db.transaction(), doc_ref, "Ironing tracking record not found.", _validate, updates
+    )
+
+    return _tracking_response(doc_ref, tracking_data, updates)
+
+
+async def _handle_complete_ironing(request, current_user, now):
+    if not request.tracking_id:
+        raise HTTPException(status_code=400, detail="tracking_id is required for COMPLETE_IRONING action.")
 
-        if tracking_data.get("status") != ProductionStatus.IN_PROGRESS.value:
+    doc_ref = _PRODUCTION_COL.document(request.tracking_id)
+
+    def _validate(tracking_data):
+        if tracking_data.get("stage") != _IRONING:
+            raise HTTPException(status_code=400, detail="This action is only for ironing stage.")
+        if tracking_data.get("status") != _IN_PROGRESS:
             raise HTTPException(status_code=400, detail="Ironing stage is not in progress.")
-        
-        doc_ref.update({
-            "status": ProductionStatus.COMPLETED.value,
-            "stages.ironing.status": ProductionStatus.COMPLETED.value,
-            "stages.ironing.completed_at": now,
-            "updated_at": now,
-            "completed_at": now,
-        })
-
-        design_id = tracking_data.get("design_id")
-        if design_id:
-            _adjust_inventory(design_id, multiplier=1)
-        
-        return _tracking_response(doc_ref)
-
-    # --- READ_ALL Operation ---
-    elif action == CrudAction.READ_ALL:
-        docs = db.collection(PRODUCTION_COLLECTION).stream()
-        results = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            results.append(data)
-        return results
-
-    # --- GET_BY_DESIGN Operation ---
-    elif action == CrudAction.GET_BY_DESIGN:
-        if not design_id:
-            raise HTTPException(status_code=400, detail="design_id is required for GET_BY_DESIGN action.")
-        
-        design_ref = db.collection(DESIGN_COLLECTION).document(design_id)
-        if not design_ref.get().exists:
-            raise HTTPException(status_code=404, detail="Design not found")
-            
-        docs = db.collection(PRODUCTION_COLLECTION).where(filter=FieldFilter("design_id", "==", design_id)).stream()
-        results = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            results.append(data)
-        return results
-
-    # --- GET_BY_STAGE Operation ---
-    elif action == CrudAction.GET_BY_STAGE:
-        stage = request.stage
-        if not stage:
-            raise HTTPException(status_code=400, detail="stage is required for GET_BY_STAGE action.")
-        
-        docs = db.collection(PRODUCTION_COLLECTION).where(filter=FieldFilter("stage", "==", stage.value)).stream()
-        results = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            results.append(data)
-        return results
-
-    # --- GET_IN_PROGRESS Operation ---
-    elif action == CrudAction.GET_IN_PROGRESS:
-        docs = db.collection(PRODUCTION_COLLECTION).where(filter=FieldFilter(
-            "status", "in", [ProductionStatus.IN_PROGRESS.value, ProductionStatus.PENDING.value]
-        )).stream()
-        results = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            results.append(data)
-        return results
-
-    # --- DELETE Operation --- (Revert to Previous Stage)
-    elif action == CrudAction.DELETE:
-        if not tracking_id:
-            raise HTTPException(status_code=400, detail="tracking_id is required for DELETE action.")
-        
-        if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-            raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
-        
-        doc_ref, doc = _get_tracking_by_id(tracking_id)
-        tracking_data = doc.to_dict()
-        stage_data = tracking_data.get("stages") or {}
-        current_stage_value = tracking_data.get("stage")
-        current_stage = ProductionStage(current_stage_value)
-        current_index = STAGE_SEQUENCE.index(current_stage)
 
-        if current_index == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Cannot revert: production is at cutting start. Delete the design to remove this tracking record."
-            )
+    updates = {
+        "status": _COMPLETED,
+        "stages.ironing.status": _COMPLETED,
+        "stages.ironing.completed_at": now,
+        "updated_at": now,
+        "completed_at": now,
+    }
+    tracking_data = await _complete_ironing_in_transaction(
+        async_db.transaction(), doc_ref, _validate, updates
+    )
+    if tracking_data.get("design_id"):
+        await cache.invalidate_inventory(tracking_data["design_id"])
 
-        previous_stage = STAGE_SEQUENCE[current_index - 1]
-        previous_key = previous_stage.value
-        current_key = current_stage.value
+    return _tracking_response(doc_ref, tracking_data, updates)
 
-        if stage_data.get(previous_key, {}).get("status") == ProductionStatus.PENDING.value:
-            raise HTTPException(status_code=400, detail=f"Cannot revert: {previous_key} has not been started.")
 
-        design_id = tracking_data.get("design_id")
-        current_stage_state = stage_data.get(current_key, {})
+async def _handle_read_all(request, current_user, now):
+    # get() fetches the whole result set in batched responses instead of
+    # delivering rows one message at a time through the stream iterator.
+    docs = await _PRODUCTION_COL.select(_LISTING_FIELDS).get()
+    # Returning the response directly skips the jsonable_encoder walk
+    # over every row; orjson encodes the datetimes itself.
+    return ORJSONResponse([{**doc.to_dict(), "id": doc.id} for doc in docs])
 
-        if (
-            current_stage == ProductionStage.IRONING
-            and current_stage_state.get("status") == ProductionStatus.COMPLETED.value
-            and design_id
-        ):
-            _adjust_inventory(design_id, multiplier=-1)
 
-        updates = {
-            "stage": previous_stage.value,
-            "status": ProductionStatus.PENDING.value,
-            "arrived_at": None,
-            "completed_at": None,
-            f"stages.{previous_key}.status": ProductionStatus.PENDING.value,
-            f"stages.{previous_key}.arrived_at": None,
-            f"stages.{previous_key}.completed_at": None,
-            f"stages.{current_key}.status": ProductionStatus.PENDING.value,
-            f"stages.{current_key}.arrived_at": None,
-            f"stages.{current_key}.completed_at": None,
-            "updated_at": now,
-        }
+async def _handle_get_by_design(request, current_user, now):
+    design_id = request.design_id
+    if not design_id:
+        raise HTTPException(status_code=400, detail="design_id is required for GET_BY_DESIGN action.")
 
-        doc_ref.update(updates)
-        return {
-            "status": "success",
-            "message": f"Reverted to {previous_key} stage for design {tracking_data.get('design_id')}.",
-            "tracking": _tracking_response(doc_ref)
-        }
+    design_exists, _ = await _load_design(design_id)
+    if not design_exists:
+        raise HTTPException(status_code=404, detail="Design not found")
 
-    else:
+    docs = await _apply_page(_PRODUCTION_COL.where(
+        filter=FieldFilter("design_id", "==", design_id)
+    ).select(_LISTING_FIELDS), request).get()
+    return ORJSONResponse([{**doc.to_dict(), "id": doc.id} for doc in docs])
+
+
+async def _handle_get_by_stage(request, current_user, now):
+    stage = request.stage
+    if not stage:
+        raise HTTPException(status_code=400, detail="stage is required for GET_BY_STAGE action.")
+
+    docs = await _apply_page(_PRODUCTION_COL.where(
+        filter=FieldFilter("stage", "==", stage.value)
+    ).select(_LISTING_FIELDS), request).get()
+    return ORJSONResponse([{**doc.to_dict(), "id": doc.id} for doc in docs])
+
+
+async def _handle_get_in_progress(request, current_user, now):
+    # An IN filter cannot be ordered and paginated efficiently, so run
+    # one equality query per status concurrently and merge the pages.
+    in_progress_docs, pending_docs = await asyncio.gather(*(
+        _apply_page(_PRODUCTION_COL.where(
+            filter=FieldFilter("status", "==", status_value)
+        ).select(_LISTING_FIELDS), request).get()
+        for status_value in (_IN_PROGRESS, _PENDING)
+    ))
+
+    results = []
+    for doc in (*in_progress_docs, *pending_docs):
+        data = doc.to_dict()
+        data["id"] = doc.id
+        results.append(data)
+    results.sort(key=lambda row: row.get("updated_at") or _EPOCH_MIN, reverse=True)
+    return ORJSONResponse(results[:request.limit])
+
+
+async def _handle_delete(request, current_user, now):
+    """Revert a tracking record to its previous stage."""
+    tracking_id = request.tracking_id
+    if not tracking_id:
+        raise HTTPException(status_code=400, detail="tracking_id is required for DELETE action.")
+
+    if current_user["access_level"] != AccessLevel.LEVEL_2.value:
+        raise HTTPException(status_code=403, detail="You do not have permission to perform this action")
+
+    doc_ref, doc = await _get_tracking_by_id(tracking_id)
+    tracking_data = doc.to_dict()
+    stage_data = tracking_data.get("stages") or {}
+    current_key = tracking_data.get("stage")
+    if current_key not in _STAGE_INDEX:
+        raise HTTPException(status_code=400, detail=f"Unknown production stage: {current_key}.")
+
+    if _STAGE_INDEX[current_key] == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot revert: production is at cutting start. Delete the design to remove this tracking record."
+        )
+
+    previous_key = _PREV_STAGE[current_key]
+
+    if stage_data.get(previous_key, {}).get("status") == _PENDING:
+        raise HTTPException(status_code=400, detail=f"Cannot revert: {previous_key} has not been started.")
+
+    design_id = tracking_data.get("design_id")
+    current_stage_state = stage_data.get(current_key, {})
+
+    if (
+        current_key == _IRONING
+        and current_stage_state.get("status") == _COMPLETED
+        and design_id
+    ):
+        await _adjust_inventory(design_id, multiplier=-1)
+
+    updates = {
+        "stage": previous_key,
+        "status": _PENDING,
+        "arrived_at": None,
+        "completed_at": None,
+        **_reset_stage(previous_key),
+        **_reset_stage(current_key),
+        "updated_at": now,
+    }
+
+    await doc_ref.update(updates)
+    return {
+        "status": "success",
+        "message": f"Reverted to {previous_key} stage for design {tracking_data.get('design_id')}.",
+        "tracking": _tracking_response(doc_ref, tracking_data, updates)
+    }
+
+
+# Single dict lookup per request instead of walking the comparison chain.
+_DISPATCH = {
+    CrudAction.START_CUTTING: _handle_start_cutting,
+    CrudAction.COMPLETE_CUTTING: _handle_complete_cutting,
+    CrudAction.START_SEWING: _handle_start_sewing,
+    CrudAction.COMPLETE_SEWING: _handle_complete_sewing,
+    CrudAction.START_IRONING: _handle_start_ironing,
+    CrudAction.COMPLETE_IRONING: _handle_complete_ironing,
+    CrudAction.READ_ALL: _handle_read_all,
+    CrudAction.GET_BY_DESIGN: _handle_get_by_design,
+    CrudAction.GET_BY_STAGE: _handle_get_by_stage,
+    CrudAction.GET_IN_PROGRESS: _handle_get_in_progress,
+    CrudAction.DELETE: _handle_delete,
+}
+
+
+@router.post("/operate", response_model=Any, status_code=status.HTTP_200_OK)
+async def operate_production(
+    request: ProductionOperationRequest,
+    current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
+):
+    handler = _DISPATCH.get(request.action)
+    if handler is None:
         raise HTTPException(status_code=400, detail="Invalid action specified.")
+    return await handler(request, current_user, datetime.utcnow())
@@ -1,8 +1,9 @@
+from collections import Counter
 from datetime import datetime
 from typing import Dict
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.auth import get_current_user_with_access
 from app.models.quotation import (
@@ -13,22 +14,26 @@ from app.models.quotation import (
     QuotationResponse,
 )
 from app.models.user import AccessLevel
-from app.services.firebase_service import db, INVENTORY_COLLECTION
+from app.services import cache
+from app.services.firebase_service import async_db, INVENTORY_COLLECTION
 
 router = APIRouter(
     prefix="/quotations",
     tags=["Quotations"]
 )
 
+# Compiled once at import; validate_python reuses the core schema
+# instead of re-dispatching through model construction per request.
+_QUOTATION_PAYLOAD_ADAPTER = TypeAdapter(QuotationCreatePayload)
+
 
 def _normalize_sizes(items) -> Dict[str, int]:
     """Aggregate requested quantities per size for quick lookups."""
-    totals: Dict[str, int] = {}
+    # Counter accumulates at C level instead of per-item dict.get calls.
+    totals: Counter = Counter()
     for item in items:
-        size = item.size
-        quantity = int(item.quantity)
-        totals[size] = totals.get(size, 0) + quantity
-    return totals
+        totals[item.size] += int(item.quantity)
+    return dict(totals)
 
 
 @router.post(
@@ -36,7 +41,7 @@ def _normalize_sizes(items) -> Dict[str, int]:
     response_model=QuotationResponse,
     status_code=status.HTTP_200_OK,
 )
-def operate_quotation(
+async def operate_quotation(
     request: QuotationOperationRequest,
     current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1)),
 ):
@@ -45,40 +50,47 @@ def operate_quotation(
 
     payload_data = request.payload or {}
     try:
-        payload = QuotationCreatePayload(**payload_data)
+        payload = _QUOTATION_PAYLOAD_ADAPTER.validate_python(payload_data)
     except ValidationError as exc:
         raise HTTPException(
             status_code=422,
             detail=f"Invalid payload for generating quotation: {exc}",
         )
 
-    inventory_ref = db.collection(INVENTORY_COLLECTION).document(payload.design_id)
-    inventory_doc = inventory_ref.get()
-    if not inventory_doc.exists:
-        raise HTTPException(status_code=404, detail="Inventory record not found for the design.")
-
-    inventory_data = inventory_doc.to_dict() or {}
+    # Quotations never write, so serve the inventory doc from the shared
+    # cache and only hit Firestore on a miss.
+    inventory_data = await cache.get_inventory(payload.design_id)
+    if inventory_data is None:
+        inventory_doc = await async_db.collection(INVENTORY_COLLECTION).document(payload.design_id).get()
+        if not inventory_doc.exists:
+            raise HTTPException(status_code=404, detail="Inventory record not found for the design.")
+        inventory_data = inventory_doc.to_dict() or {}
+        await cache.put_inventory(payload.design_id, inventory_data)
     inventory_sizes = {size: int(qty) for size, qty in (inventory_data.get("sizes") or {}).items()}
 
     size_totals = _normalize_sizes(payload.items)
-    insufficient_sizes = []
-    for size, qty in size_totals.items():
-        available = inventory_sizes.get(size, 0)
-        if available < qty:
-            insufficient_sizes.append(f"{size} (requested {qty}, available {available})")
-
-    if insufficient_sizes:
+    # Cheap pass first: the detail strings are only worth building on the
+    # rare failure path, so keep the common success path allocation-free.
+    if any(inventory_sizes.get(size, 0) < qty for size, qty in size_totals.items()):
+        insufficient_sizes = ", ".join(
+            f"{size} (requested {qty}, available {inventory_sizes.get(size, 0)})"
+            for size, qty in size_totals.items()
+            if inventory_sizes.get(size, 0) < qty
+        )
         raise HTTPException(
             status_code=400,
-            detail="Not enough stock for: " + ", ".join(insufficient_sizes),
+            detail="Not enough stock for: " + insufficient_sizes,
         )
 
     unit_price = float(payload.selling_price_per_piece)
     total_quantity = sum(size_totals.values())
     total_amount = unit_price * total_quantity
 
+    # The response is assembled from values we just computed, so skip
+    # re-validating them with model_construct; the inbound payload above
+    # keeps full validation.
     quotation_items = [
-        QuotationLine(
+        QuotationLine.model_construct(
             size=item.size,
             requested_quantity=item.quantity,
             available_quantity=inventory_sizes.get(item.size, 0),
@@ -88,7 +100,7 @@ def operate_quotation(
         for item in payload.items
     ]
 
-    response = QuotationResponse(
+    response = QuotationResponse.model_construct(
         design_id=payload.design_id,
         total_requested_quantity=total_quantity,
         total_amount=total_amount,
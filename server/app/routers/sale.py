@@ -1,50 +1,61 @@
+from collections import Counter
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import msgspec
+import hashlib
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from google.cloud import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
-from pydantic import ValidationError
-
 from app.auth import get_current_user_with_access
 from app.models.sale import (
-    CreditPaymentPayload,
     PaymentType,
     SaleAction,
-    SaleCreatePayload,
     SaleOperationRequest,
     SaleRecord,
-    SaleUpdatePayload,
+    SaleRecordStruct,
 )
 from app.models.user import AccessLevel
+from app.responses import ORJSONResponse
+from app.services import cache, sale_cache
 from app.services.firebase_service import (
-    db,
+    async_db,
     INVENTORY_COLLECTION,
     SALES_COLLECTION,
+    SALE_ROLLUP_COLLECTION,
 )
 
 router = APIRouter(
     prefix="/sales",
-    tags=["Sales"]
+    tags=["Sales"],
+    default_response_class=ORJSONResponse
 )
 
+# Enum .value lookups resolved once, as in the production router.
+_CASH = PaymentType.CASH.value
+_CREDIT = PaymentType.CREDIT.value
+_LEVEL_2 = AccessLevel.LEVEL_2.value
+
 
 def _normalize_sizes(items: Any) -> Dict[str, int]:
     """Aggregate quantities per size from payload or stored sale items."""
-    size_totals: Dict[str, int] = {}
     if not items:
-        return size_totals
-    for item in items:
-        if isinstance(item, dict):
+        return {}
+    # Counter accumulates at C level; the dict/model branch is decided
+    # once per call since a batch never mixes the two shapes.
+    totals: Counter = Counter()
+    if isinstance(items[0], dict):
+        for item in items:
             size = item.get("size")
-            quantity = int(item.get("quantity", 0))
-        else:
+            if size:
+                totals[size] += int(item.get("quantity", 0))
+    else:
+        for item in items:
             size = getattr(item, "size", None)
-            quantity = int(getattr(item, "quantity", 0))
-        if not size:
-            continue
-        size_totals[size] = size_totals.get(size, 0) + quantity
-    return size_totals
+            if size:
+                totals[size] += int(getattr(item, "quantity", 0))
+    return dict(totals)
 
 
 def _extract_unit_price(items: Any, *, default: Optional[float] = None) -> float:
@@ -79,46 +90,73 @@ def _extract_unit_price(items: Any, *, default: Optional[float] = None) -> float
     raise HTTPException(status_code=400, detail="Selling price is required for the sale.")
 
 
-def _build_line_items(payload_items: List[Any], unit_price: float) -> Dict[str, Any]:
-    """Build sale line items using the fixed unit selling price."""
+def _build_items_and_totals(payload_items: List[Any], unit_price: float):
+    """
+    Walk validated payload items once: build the stored line items,
+    aggregate quantities per size, and sum the totals in the same pass
+    instead of traversing the pydantic models twice.
+    """
     items: List[Dict[str, Any]] = []
+    size_totals: Counter = Counter()
     total_quantity = 0
     total_amount = 0.0
 
     for item in payload_items:
-        if isinstance(item, dict):
-            quantity = int(item.get("quantity", 0))
-            size = item.get("size")
-        else:
-            quantity = int(getattr(item, "quantity", 0))
-            size = getattr(item, "size", None)
-
+        quantity = int(item.quantity)
         line_total = unit_price * quantity
         items.append({
-            "size": size,
+            "size": item.size,
             "quantity": quantity,
             "selling_price": unit_price,
             "line_total": line_total,
         })
+        size_totals[item.size] += quantity
         total_quantity += quantity
         total_amount += line_total
 
-    return {
+    build_result = {
         "items": items,
         "total_quantity": total_quantity,
         "total_amount": total_amount,
     }
+    return build_result, dict(size_totals)
+
+
+def _encode_unsupported(obj):
+    # Firestore hands timestamps back as DatetimeWithNanoseconds, a
+    # datetime subclass msgspec refuses to encode natively.
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Encoding objects of type {type(obj)} is unsupported")
+
+
+# Shared encoder instance; msgspec compiles the struct layout once.
+_SALE_JSON_ENCODER = msgspec.json.Encoder(enc_hook=_encode_unsupported)
 
+# Listing projection: everything the summary rows need except
+# payment_history, which grows with every payment and dominates the
+# document size on long-running credit sales.
+_LISTING_FIELDS = [
+    "customer_name", "customer_phone", "design_id", "items",
+    "total_quantity", "total_amount", "payment_type", "amount_paid",
+    "balance", "created_at", "updated_at",
+]
 
-def _format_sale_doc(doc) -> SaleRecord:
+
+def _encode_sale_page(structs, next_cursor) -> Response:
+    """Encode one listing page in the shared {sales, next_cursor} shape."""
+    return Response(
+        content=_SALE_JSON_ENCODER.encode({"sales": structs, "next_cursor": next_cursor}),
+        media_type="application/json",
+    )
+
+
+def _format_sale_struct(doc) -> SaleRecordStruct:
+    """Build the msgspec twin of _format_sale_data for listing responses."""
     data = doc.to_dict() or {}
-    payment_history = data.get("payment_history") or []
     amount_paid = float(data.get("amount_paid", 0.0))
     total_amount = float(data.get("total_amount", 0.0))
-    balance = float(data.get("balance", total_amount - amount_paid))
-    payment_type = data.get("payment_type") or PaymentType.CASH.value
-
-    formatted = SaleRecord(
+    return SaleRecordStruct(
         id=doc.id,
         customer_name=data.get("customer_name", ""),
         customer_phone=data.get("customer_phone", ""),
@@ -126,360 +164,577 @@ def _format_sale_doc(doc) -> SaleRecord:
         items=data.get("items", []),
         total_quantity=int(data.get("total_quantity", 0)),
         total_amount=total_amount,
-        payment_type=payment_type,
+        payment_type=data.get("payment_type") or _CASH,
         amount_paid=amount_paid,
-        balance=balance,
-        payment_history=payment_history,
+        balance=float(data.get("balance", total_amount - amount_paid)),
+        payment_history=data.get("payment_history") or [],
         created_at=data.get("created_at"),
         updated_at=data.get("updated_at"),
     )
-    return formatted
 
 
-@router.post("/operate", status_code=status.HTTP_200_OK)
-def operate_sales(
-    request: SaleOperationRequest,
-    current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
-):
-    action = request.action
-
-    if action == SaleAction.CREATE:
-        payload_data = request.payload or {}
-        try:
-            payload = SaleCreatePayload(**payload_data)
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for creating sale: {e}")
-
-        design_id = payload.design_id
-        inventory_ref = db.collection(INVENTORY_COLLECTION).document(design_id)
-        inventory_doc = inventory_ref.get()
-        if not inventory_doc.exists:
-            raise HTTPException(status_code=400, detail="No inventory available for the selected design.")
-
-        inventory_data = inventory_doc.to_dict()
-        inventory_sizes = {size: int(qty) for size, qty in (inventory_data.get("sizes") or {}).items()}
-        size_totals = _normalize_sizes(payload.items)
-        unit_price = float(payload.selling_price_per_piece)
-
-        for size, qty in size_totals.items():
+def _apply_rollup(transaction, design_id, *, sale_delta=0, units_delta=0, revenue_delta=0.0):
+    """
+    Keep the per-design sale_rollup/{design_id} aggregate in step with the
+    sale write it rides along with. Blind increments inside the same
+    commit give dashboards O(1) per-design totals without streaming the
+    sales collection.
+    """
+    rollup_ref = async_db.collection(SALE_ROLLUP_COLLECTION).document(design_id)
+    transaction.set(rollup_ref, {
+        "design_id": design_id,
+        "sale_count": firestore.Increment(sale_delta),
+        "total_units": firestore.Increment(units_delta),
+        "total_revenue": firestore.Increment(revenue_delta),
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    }, merge=True)
+
+
+@firestore.async_transactional
+async def _create_sale_in_transaction(transaction, inventory_ref, sale_ref, size_totals,
+                                      total_quantity, sale_record):
+    """
+    Check stock, deduct it, and write the sale in one atomic commit, so
+    concurrent sales on the same design cannot both pass the stock check
+    and oversell the inventory.
+    """
+    inventory_doc = await inventory_ref.get(transaction=transaction)
+    if not inventory_doc.exists:
+        raise HTTPException(status_code=400, detail="No inventory available for the selected design.")
+
+    inventory_data = inventory_doc.to_dict()
+    inventory_sizes = inventory_data.get("sizes") or {}
+    for size, qty in size_totals.items():
+        available = int(inventory_sizes.get(size, 0))
+        if available < qty:
+            raise HTTPException(status_code=400, detail=f"Not enough stock for size {size}. Available: {available}")
+
+    if int(inventory_data.get("total_available", 0)) - total_quantity < 0:
+        raise HTTPException(status_code=400, detail="Inventory would become negative.")
+
+    # Server-side deltas: the availability check above still pins the
+    # read inside the transaction, but the write no longer rewrites the
+    # whole sizes map.
+    transaction.update(inventory_ref, {
+        **{f"sizes.{size}": firestore.Increment(-qty) for size, qty in size_totals.items()},
+        "total_available": firestore.Increment(-total_quantity),
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    })
+    transaction.set(sale_ref, sale_record)
+    _apply_rollup(transaction, sale_record["design_id"], sale_delta=1,
+                  units_delta=total_quantity, revenue_delta=sale_record["total_amount"])
+
+
+@firestore.async_transactional
+async def _update_sale_in_transaction(transaction, sale_ref, payload, now, design_id_hint=None):
+    """
+    Validate the sale, re-balance inventory against the new line items,
+    and apply both writes atomically. When the caller already knows the
+    design_id, both documents are fetched in a single get_all() round
+    trip; otherwise the reads fall back to the two-step.
+    """
+    inventory_ref = None
+    inventory_doc = None
+    if design_id_hint:
+        inventory_ref = async_db.collection(INVENTORY_COLLECTION).document(design_id_hint)
+        # get_all does not guarantee ordering; key the snapshots by path.
+        snapshots = {snap.reference.path: snap async for snap in transaction.get_all([sale_ref, inventory_ref])}
+        sale_doc = snapshots[sale_ref.path]
+        inventory_doc = snapshots[inventory_ref.path]
+    else:
+        sale_doc = await sale_ref.get(transaction=transaction)
+
+    if not sale_doc.exists:
+        raise HTTPException(status_code=404, detail="Sale not found.")
+
+    existing_sale = sale_doc.to_dict()
+    balance = float(existing_sale.get("balance", existing_sale.get("total_amount", 0.0) - existing_sale.get("amount_paid", 0.0)))
+    if balance > 1e-6:
+        raise HTTPException(status_code=400, detail="Cannot update sale details while balance remains outstanding.")
+
+    design_id = existing_sale.get("design_id")
+    if not design_id:
+        raise HTTPException(status_code=400, detail="Sale is missing design information.")
+
+    if inventory_doc is None or design_id != design_id_hint:
+        inventory_ref = async_db.collection(INVENTORY_COLLECTION).document(design_id)
+        inventory_doc = await inventory_ref.get(transaction=transaction)
+    if not inventory_doc.exists:
+        raise HTTPException(status_code=400, detail="Inventory record missing for the design.")
+
+    inventory_data = inventory_doc.to_dict()
+    inventory_sizes = {size: int(qty) for size, qty in (inventory_data.get("sizes") or {}).items()}
+
+    old_items = existing_sale.get("items", [])
+    old_totals = _normalize_sizes(old_items)
+
+    update_fields: Dict[str, Any] = {}
+
+    if payload.customer_name is not None:
+        update_fields["customer_name"] = payload.customer_name
+    if payload.customer_phone is not None:
+        update_fields["customer_phone"] = payload.customer_phone
+
+    unit_price = existing_sale.get("unit_selling_price")
+    if unit_price is None:
+        unit_price = _extract_unit_price(existing_sale.get("items", []))
+    unit_price = float(unit_price)
+
+    if payload.items is not None:
+        build_result, new_totals = _build_items_and_totals(payload.items, unit_price)
+
+        for size, qty in old_totals.items():
+            inventory_sizes[size] = int(inventory_sizes.get(size, 0)) + qty
+
+        for size, qty in new_totals.items():
             available = int(inventory_sizes.get(size, 0))
             if available < qty:
                 raise HTTPException(status_code=400, detail=f"Not enough stock for size {size}. Available: {available}")
-            inventory_sizes[size] = available - qty
 
-        build_result = _build_line_items(payload.items, unit_price)
-        total_quantity = build_result["total_quantity"]
+        total_new = build_result["total_quantity"]
         total_amount = build_result["total_amount"]
-
-        amount_paid = float(payload.amount_paid)
-        if payload.payment_type == PaymentType.CASH and abs(amount_paid - total_amount) > 1e-6:
-            raise HTTPException(status_code=400, detail="Cash sales must be fully paid at the time of purchase.")
-        if payload.payment_type == PaymentType.CREDIT and amount_paid - total_amount > 1e-6:
-            raise HTTPException(status_code=400, detail="Initial payment cannot exceed the total sale amount.")
-
-        balance = total_amount - amount_paid
-        if balance < -1e-6:
-            raise HTTPException(status_code=400, detail="Calculated balance cannot be negative.")
-
-        remaining_total = int(inventory_data.get("total_available", 0)) - total_quantity
-        if remaining_total < 0:
+        total_old = sum(old_totals.values())
+        existing_total_amount = float(existing_sale.get("total_amount", 0.0))
+        if abs(total_amount - existing_total_amount) > 1e-6:
+            raise HTTPException(
+                status_code=400,
+                detail="Updated items would change the total amount. Adjust payments using MAKE_PAYMENT first."
+            )
+
+        if int(inventory_data.get("total_available", 0)) + total_old - total_new < 0:
             raise HTTPException(status_code=400, detail="Inventory would become negative.")
 
-        now = datetime.utcnow()
-        payment_history: List[Dict[str, Any]] = []
-        if amount_paid > 0:
-            note = "Initial payment"
-            payment_history.append({
-                "payment_amount": amount_paid,
-                "payment_date": now,
-                "payment_note": note,
-                "remaining_balance": max(balance, 0.0),
-            })
-
-        inventory_ref.update({
-            "sizes": inventory_sizes,
-            "total_available": remaining_total,
-            "updated_at": now,
+        # Net per-size deltas (restore old items, deduct new) applied as
+        # server-side increments instead of rewriting the sizes map.
+        size_deltas = Counter(old_totals)
+        size_deltas.subtract(new_totals)
+        transaction.update(inventory_ref, {
+            **{f"sizes.{size}": firestore.Increment(delta) for size, delta in size_deltas.items() if delta},
+            "total_available": firestore.Increment(total_old - total_new),
+            "updated_at": firestore.SERVER_TIMESTAMP,
         })
+        if total_new != total_old:
+            _apply_rollup(transaction, design_id, units_delta=total_new - total_old)
 
-        sale_record = {
-            "customer_name": payload.customer_name,
-            "customer_phone": payload.customer_phone,
-            "design_id": design_id,
+        update_fields.update({
             "items": build_result["items"],
-            "total_quantity": total_quantity,
+            "total_quantity": total_new,
             "total_amount": total_amount,
             "unit_selling_price": unit_price,
-             "payment_type": payload.payment_type.value,
-             "amount_paid": amount_paid,
-             "balance": max(balance, 0.0),
-             "payment_history": payment_history,
-            "created_at": now,
-            "updated_at": now,
-        }
-        doc_ref = db.collection(SALES_COLLECTION).document()
-        doc_ref.set(sale_record)
-        sale_doc = doc_ref.get()
-        return _format_sale_doc(sale_doc).model_dump()
-
-    if action == SaleAction.READ_ALL:
-        docs = db.collection(SALES_COLLECTION).stream()
-        sales = []
-        for doc in docs:
-            sales.append(_format_sale_doc(doc).model_dump())
-        return sales
-
-    if action == SaleAction.GET_BY_ID:
-        doc_ref = db.collection(SALES_COLLECTION).document(request.sale_id)
-        doc = doc_ref.get()
-        if not doc.exists:
-            raise HTTPException(status_code=404, detail="Sale not found.")
-        return _format_sale_doc(doc).model_dump()
-
-    if action == SaleAction.GET_BY_DESIGN:
-        docs = db.collection(SALES_COLLECTION).where(
-            filter=FieldFilter("design_id", "==", request.design_id)
-        ).stream()
-        sales = []
-        for doc in docs:
-            sales.append(_format_sale_doc(doc).model_dump())
-        return sales
-
-    if action == SaleAction.GET_CREDIT_SALES:
-        query = db.collection(SALES_COLLECTION).where(
-            filter=FieldFilter("balance", ">", 0)
-        ).order_by("balance", direction=firestore.Query.DESCENDING)
-        docs = query.stream()
-        credit_sales = []
-        for doc in docs:
-            formatted = _format_sale_doc(doc)
-            credit_sales.append(formatted.model_dump())
-        return credit_sales
-
-    if action == SaleAction.UPDATE:
-        payload_data = request.payload or {}
-        prohibited_fields = {"payment_type", "amount_paid", "balance"}
-        if any(field in payload_data for field in prohibited_fields):
-            raise HTTPException(status_code=400, detail="Use MAKE_PAYMENT to modify payment details.")
-
-        try:
-            payload = SaleUpdatePayload(**payload_data)
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for updating sale: {e}")
-
-        sale_ref = db.collection(SALES_COLLECTION).document(request.sale_id)
-        sale_doc = sale_ref.get()
-        if not sale_doc.exists:
-            raise HTTPException(status_code=404, detail="Sale not found.")
+        })
 
-        existing_sale = sale_doc.to_dict()
-        balance = float(existing_sale.get("balance", existing_sale.get("total_amount", 0.0) - existing_sale.get("amount_paid", 0.0)))
-        if balance > 1e-6:
-            raise HTTPException(status_code=400, detail="Cannot update sale details while balance remains outstanding.")
-
-        design_id = existing_sale.get("design_id")
-        if not design_id:
-            raise HTTPException(status_code=400, detail="Sale is missing design information.")
-
-        inventory_ref = db.collection(INVENTORY_COLLECTION).document(design_id)
-        inventory_doc = inventory_ref.get()
-        if not inventory_doc.exists:
-            raise HTTPException(status_code=400, detail="Inventory record missing for the design.")
-
-        inventory_data = inventory_doc.to_dict()
-        inventory_sizes = {size: int(qty) for size, qty in (inventory_data.get("sizes") or {}).items()}
-
-        old_items = existing_sale.get("items", [])
-        old_totals = _normalize_sizes(old_items)
-        new_totals = _normalize_sizes(payload.items) if payload.items is not None else old_totals
-
-        update_fields: Dict[str, Any] = {}
-
-        if payload.customer_name is not None:
-            update_fields["customer_name"] = payload.customer_name
-        if payload.customer_phone is not None:
-            update_fields["customer_phone"] = payload.customer_phone
-
-        unit_price = existing_sale.get("unit_selling_price")
-        if unit_price is None:
-            unit_price = _extract_unit_price(existing_sale.get("items", []))
-        unit_price = float(unit_price)
-
-        if payload.items is not None:
-            for size, qty in old_totals.items():
-                inventory_sizes[size] = int(inventory_sizes.get(size, 0)) + qty
-
-            for size, qty in new_totals.items():
-                available = int(inventory_sizes.get(size, 0))
-                if available < qty:
-                    raise HTTPException(status_code=400, detail=f"Not enough stock for size {size}. Available: {available}")
-                inventory_sizes[size] = available - qty
-
-            build_result = _build_line_items(payload.items, unit_price)
-            total_new = build_result["total_quantity"]
-            total_amount = build_result["total_amount"]
-            total_old = sum(old_totals.values())
-            existing_total_amount = float(existing_sale.get("total_amount", 0.0))
-            if abs(total_amount - existing_total_amount) > 1e-6:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Updated items would change the total amount. Adjust payments using MAKE_PAYMENT first."
-                )
+    if not update_fields:
+        raise HTTPException(status_code=400, detail="No valid fields provided for update.")
 
-            remaining_total = int(inventory_data.get("total_available", 0)) + total_old - total_new
-            if remaining_total < 0:
-                raise HTTPException(status_code=400, detail="Inventory would become negative.")
-
-            now = datetime.utcnow()
-            inventory_ref.update({
-                "sizes": inventory_sizes,
-                "total_available": remaining_total,
-                "updated_at": now,
-            })
-
-            update_fields.update({
-                "items": build_result["items"],
-                "total_quantity": total_new,
-                "total_amount": total_amount,
-                "unit_selling_price": unit_price,
-            })
-
-        if not update_fields:
-            raise HTTPException(status_code=400, detail="No valid fields provided for update.")
-
-        now = datetime.utcnow()
-        update_fields["updated_at"] = now
-        sale_ref.update(update_fields)
-
-        updated_doc = sale_ref.get()
-        return _format_sale_doc(updated_doc).model_dump()
-
-    if action == SaleAction.MAKE_PAYMENT:
-        payload_data = request.payload or {}
-        try:
-            payment_payload = CreditPaymentPayload(**payload_data)
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=f"Invalid payload for credit payment: {e}")
-
-        sale_ref = db.collection(SALES_COLLECTION).document(request.sale_id)
-        sale_doc = sale_ref.get()
-        if not sale_doc.exists:
-            raise HTTPException(status_code=404, detail="Sale not found.")
+    update_fields["updated_at"] = now
+    transaction.update(sale_ref, update_fields)
+    return existing_sale, update_fields
+
+
+@firestore.async_transactional
+async def _delete_sale_in_transaction(transaction, sale_ref, inventory_ref, sale_totals,
+                                      total_return, design_id, total_amount):
+    """Restore sold units to inventory and delete the sale atomically."""
+    inventory_doc = await inventory_ref.get(transaction=transaction)
+    if not inventory_doc.exists:
+        raise HTTPException(status_code=400, detail="Inventory record missing for the design.")
+
+    # Restocking only adds units, so blind server-side increments are
+    # safe; the read above just guards against a missing inventory doc.
+    transaction.update(inventory_ref, {
+        **{f"sizes.{size}": firestore.Increment(qty) for size, qty in sale_totals.items()},
+        "total_available": firestore.Increment(total_return),
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    })
+    transaction.delete(sale_ref)
+    _apply_rollup(transaction, design_id, sale_delta=-1,
+                  units_delta=-total_return, revenue_delta=-total_amount)
+
+
+def _format_sale_data(sale_id: str, data: Dict[str, Any]) -> SaleRecord:
+    payment_history = data.get("payment_history") or []
+    amount_paid = float(data.get("amount_paid", 0.0))
+    total_amount = float(data.get("total_amount", 0.0))
+    balance = float(data.get("balance", total_amount - amount_paid))
+    payment_type = data.get("payment_type") or _CASH
 
-        sale_data = sale_doc.to_dict()
-        if sale_data.get("payment_type") != PaymentType.CREDIT.value:
-            raise HTTPException(status_code=400, detail="Payments can only be recorded for credit sales.")
+    # Data is either straight from Firestore or assembled by the handler
+    # that just wrote it, so skip re-validation like quotation responses do.
+    formatted = SaleRecord.model_construct(
+        id=sale_id,
+        customer_name=data.get("customer_name", ""),
+        customer_phone=data.get("customer_phone", ""),
+        design_id=data.get("design_id", ""),
+        items=data.get("items", []),
+        total_quantity=int(data.get("total_quantity", 0)),
+        total_amount=total_amount,
+        payment_type=payment_type,
+        amount_paid=amount_paid,
+        balance=balance,
+        payment_history=payment_history,
+        created_at=data.get("created_at"),
+        updated_at=data.get("updated_at"),
+    )
+    return formatted
+
+
+async def _handle_create(request, current_user, http_request):
+    # Payload arrives already validated by the discriminated union.
+    payload = request.payload
+
+    design_id = payload.design_id
+    unit_price = float(payload.selling_price_per_piece)
 
-        amount_paid = float(sale_data.get("amount_paid", 0.0))
-        total_amount = float(sale_data.get("total_amount", 0.0))
-        balance = float(sale_data.get("balance", total_amount - amount_paid))
-        if balance <= 1e-6:
-            raise HTTPException(status_code=400, detail="Sale is already fully paid.")
+    build_result, size_totals = _build_items_and_totals(payload.items, unit_price)
+    total_quantity = build_result["total_quantity"]
+    total_amount = build_result["total_amount"]
 
-        payment_amount = float(payment_payload.payment_amount)
-        if payment_amount > balance + 1e-6:
-            raise HTTPException(status_code=400, detail="Payment amount cannot exceed the outstanding balance.")
+    amount_paid = float(payload.amount_paid)
+    if payload.payment_type == PaymentType.CASH and abs(amount_paid - total_amount) > 1e-6:
+        raise HTTPException(status_code=400, detail="Cash sales must be fully paid at the time of purchase.")
+    if payload.payment_type == PaymentType.CREDIT and amount_paid - total_amount > 1e-6:
+        raise HTTPException(status_code=400, detail="Initial payment cannot exceed the total sale amount.")
 
-        new_amount_paid = amount_paid + payment_amount
-        new_balance = total_amount - new_amount_paid
-        if new_balance < -1e-6:
-            raise HTTPException(status_code=400, detail="Calculated balance cannot be negative.")
+    balance = total_amount - amount_paid
+    if balance < -1e-6:
+        raise HTTPException(status_code=400, detail="Calculated balance cannot be negative.")
 
-        payment_history = list(sale_data.get("payment_history") or [])
-        now = datetime.utcnow()
+    now = datetime.utcnow()
+    payment_history: List[Dict[str, Any]] = []
+    if amount_paid > 0:
+        note = "Initial payment"
         payment_history.append({
-            "payment_amount": payment_amount,
+            "payment_amount": amount_paid,
             "payment_date": now,
-            "payment_note": payment_payload.payment_note or "Credit payment",
-            "remaining_balance": max(new_balance, 0.0),
+            "payment_note": note,
+            "remaining_balance": max(balance, 0.0),
         })
 
-        sale_ref.update({
-            "amount_paid": new_amount_paid,
-            "balance": max(new_balance, 0.0),
-            "payment_history": payment_history,
-            "updated_at": now,
-        })
-
-        updated_doc = sale_ref.get()
-        return {
-            "status": "success",
-            "message": "Payment recorded successfully.",
-            "sale": _format_sale_doc(updated_doc).model_dump(),
-        }
-
-    if action == SaleAction.GET_PAYMENT_HISTORY:
-        sale_ref = db.collection(SALES_COLLECTION).document(request.sale_id)
-        sale_doc = sale_ref.get()
-        if not sale_doc.exists:
+    sale_record = {
+        "customer_name": payload.customer_name,
+        "customer_phone": payload.customer_phone,
+        "design_id": design_id,
+        "items": build_result["items"],
+        "total_quantity": total_quantity,
+        "total_amount": total_amount,
+        "unit_selling_price": unit_price,
+         "payment_type": payload.payment_type.value,
+         "amount_paid": amount_paid,
+         "balance": max(balance, 0.0),
+         # Equality-filterable twin of balance > 0 for GET_CREDIT_SALES.
+         "has_outstanding_balance": balance > 1e-6,
+         "payment_history": payment_history,
+        # Server-stamped; the echoed response substitutes the local
+        # clock for these sentinels.
+        "created_at": firestore.SERVER_TIMESTAMP,
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    }
+    inventory_ref = async_db.collection(INVENTORY_COLLECTION).document(design_id)
+    doc_ref = async_db.collection(SALES_COLLECTION).document()
+    await _create_sale_in_transaction(
+        async_db.transaction(), inventory_ref, doc_ref, size_totals,
+        total_quantity, sale_record,
+    )
+    await cache.invalidate_inventory(design_id)
+    # Echo the record we just wrote instead of reading it back; the
+    # sentinel stamps are approximated with the request clock.
+    return _format_sale_data(
+        doc_ref.id, {**sale_record, "created_at": now, "updated_at": now}
+    ).model_dump()
+
+
+async def _handle_read_all(request, current_user, http_request):
+    # Listing paths skip pydantic entirely: trusted Firestore rows go
+    # into msgspec structs and straight through the shared encoder.
+    # One bounded, projected page per request, newest first.
+    query = async_db.collection(SALES_COLLECTION).select(_LISTING_FIELDS).order_by(
+        "created_at", direction=firestore.Query.DESCENDING
+    ).limit(request.limit)
+    if request.cursor is not None:
+        query = query.start_after({"created_at": request.cursor})
+    docs = await query.get()
+
+    structs = [_format_sale_struct(doc) for doc in docs]
+    next_cursor = None
+    if len(docs) == request.limit and structs[-1].created_at is not None:
+        next_cursor = structs[-1].created_at.isoformat()
+    return _encode_sale_page(structs, next_cursor)
+
+
+def _sale_etag(data: Dict[str, Any]) -> Optional[str]:
+    """Weak validator derived from updated_at; None when the doc lacks one."""
+    updated_at = data.get("updated_at")
+    if updated_at is None:
+        return None
+    digest = hashlib.blake2b(str(updated_at).encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+async def _handle_get_by_id(request, current_user, http_request):
+    sale_data = sale_cache.get(request.sale_id)
+    if sale_data is None:
+        doc = await async_db.collection(SALES_COLLECTION).document(request.sale_id).get()
+        if not doc.exists:
             raise HTTPException(status_code=404, detail="Sale not found.")
+        sale_data = doc.to_dict() or {}
+        sale_cache.put(request.sale_id, sale_data)
+
+    # Revalidation short-circuit: an unchanged updated_at means the
+    # client copy is current, so skip serializing the body entirely.
+    etag = _sale_etag(sale_data)
+    if etag is not None:
+        if http_request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+        return ORJSONResponse(
+            _format_sale_data(request.sale_id, sale_data).model_dump(),
+            headers={"ETag": etag},
+        )
+    return _format_sale_data(request.sale_id, sale_data).model_dump()
+
+
+async def _handle_get_by_design(request, current_user, http_request):
+    # Bounded page per request: the caller resumes with the returned
+    # cursor instead of the server materializing the whole history.
+    query = async_db.collection(SALES_COLLECTION).where(
+        filter=FieldFilter("design_id", "==", request.design_id)
+    ).select(_LISTING_FIELDS).order_by("created_at").limit(request.limit)
+    if request.cursor is not None:
+        query = query.start_after({"created_at": request.cursor})
+    docs = await query.get()
+
+    structs = [_format_sale_struct(doc) for doc in docs]
+    next_cursor = None
+    if len(docs) == request.limit and structs[-1].created_at is not None:
+        next_cursor = structs[-1].created_at.isoformat()
+    return _encode_sale_page(structs, next_cursor)
+
+
+async def _handle_get_credit_sales(request, current_user, http_request):
+    # Equality on the denormalized flag walks the composite
+    # (has_outstanding_balance, balance) index directly instead of
+    # range-scanning balance; docs written before the flag existed need
+    # a one-off backfill to appear here.
+    query = async_db.collection(SALES_COLLECTION).where(
+        filter=FieldFilter("has_outstanding_balance", "==", True)
+    ).order_by(
+        "balance", direction=firestore.Query.DESCENDING
+    ).select(_LISTING_FIELDS).limit(request.limit)
+    if request.cursor is not None:
+        query = query.start_after({"balance": request.cursor})
+    docs = await query.get()
+
+    structs = [_format_sale_struct(doc) for doc in docs]
+    next_cursor = structs[-1].balance if len(docs) == request.limit else None
+    return _encode_sale_page(structs, next_cursor)
+
+
+async def _handle_count_by_design(request, current_user, http_request):
+    # Server-side aggregation: one RPC billed as a single operation,
+    # instead of streaming every matching doc just to count it.
+    agg = async_db.collection(SALES_COLLECTION).where(
+        filter=FieldFilter("design_id", "==", request.design_id)
+    ).count(alias="count")
+    results = await agg.get()
+    return {"design_id": request.design_id, "count": int(results[0][0].value)}
+
+
+async def _handle_get_sales_summary(request, current_user, http_request):
+    # One point read of the rollup the sale mutations maintain, instead
+    # of aggregating the sales collection per request.
+    doc = await async_db.collection(SALE_ROLLUP_COLLECTION).document(request.design_id).get()
+    data = (doc.to_dict() or {}) if doc.exists else {}
+    return {
+        "design_id": request.design_id,
+        "sale_count": int(data.get("sale_count", 0)),
+        "total_units": int(data.get("total_units", 0)),
+        "total_revenue": float(data.get("total_revenue", 0.0)),
+        "updated_at": data.get("updated_at"),
+    }
 
-        sale_data = _format_sale_doc(sale_doc).model_dump()
-        return {
-            "sale_id": sale_data["id"],
-            "customer_name": sale_data["customer_name"],
-            "total_amount": sale_data["total_amount"],
-            "amount_paid": sale_data["amount_paid"],
-            "balance": sale_data["balance"],
-            "payment_history": sale_data["payment_history"],
-        }
-
-    if action == SaleAction.DELETE:
-        sale_ref = db.collection(SALES_COLLECTION).document(request.sale_id)
-        sale_doc = sale_ref.get()
-        if not sale_doc.exists:
-            raise HTTPException(status_code=404, detail="Sale not found.")
 
-        sale_data = sale_doc.to_dict()
-        balance = float(sale_data.get("balance", sale_data.get("total_amount", 0.0) - sale_data.get("amount_paid", 0.0)))
-        warning_message: Optional[str] = None
-        if balance > 1e-6:
-            if current_user["access_level"] != AccessLevel.LEVEL_2.value:
-                raise HTTPException(
-                    status_code=403,
-                    detail="Only Level 2 users can delete sales with outstanding balance."
-                )
-            warning_message = "Sale deleted with outstanding balance. Verify financial reconciliation."
+async def _handle_update(request, current_user, http_request):
+    sale_ref = async_db.collection(SALES_COLLECTION).document(request.sale_id)
+    # Cheap projected pre-read: learn the design_id so the transaction
+    # can coalesce the sale and inventory reads into one round trip.
+    hint_doc = await sale_ref.get(field_paths=["design_id"])
+    design_id_hint = (hint_doc.to_dict() or {}).get("design_id") if hint_doc.exists else None
+    existing_sale, update_fields = await _update_sale_in_transaction(
+        async_db.transaction(), sale_ref, request.payload, datetime.utcnow(), design_id_hint
+    )
 
-        design_id = sale_data.get("design_id")
-        if not design_id:
-            sale_ref.delete()
-            response = {"status": "success", "message": f"Sale {request.sale_id} deleted."}
-            if warning_message:
-                response["warning"] = warning_message
-            return response
+    # Echo the merged state we already hold instead of re-reading the doc.
+    updated_sale = {**existing_sale, **update_fields}
+    sale_cache.invalidate(request.sale_id)
+    if updated_sale.get("design_id"):
+        await cache.invalidate_inventory(updated_sale["design_id"])
+    return _format_sale_data(sale_ref.id, updated_sale).model_dump()
 
-        inventory_ref = db.collection(INVENTORY_COLLECTION).document(design_id)
-        inventory_doc = inventory_ref.get()
-        if not inventory_doc.exists:
-            raise HTTPException(status_code=400, detail="Inventory record missing for the design.")
 
-        inventory_data = inventory_doc.to_dict()
-        inventory_sizes = {size: int(qty) for size, qty in (inventory_data.get("sizes") or {}).items()}
+@firestore.async_transactional
+async def _record_payment_in_transaction(transaction, sale_ref, payment_amount, payment_note, now):
+    """
+    Validate the outstanding balance against a transactional read and
+    apply the payment in the same commit, so two concurrent payments
+    cannot both pass the check and leave amount_paid, balance and the
+    credit flag disagreeing.
+    """
+    sale_doc = await sale_ref.get(transaction=transaction)
+    if not sale_doc.exists:
+        raise HTTPException(status_code=404, detail="Sale not found.")
+
+    sale_data = sale_doc.to_dict()
+    if sale_data.get("payment_type") != _CREDIT:
+        raise HTTPException(status_code=400, detail="Payments can only be recorded for credit sales.")
+
+    amount_paid = float(sale_data.get("amount_paid", 0.0))
+    total_amount = float(sale_data.get("total_amount", 0.0))
+    balance = float(sale_data.get("balance", total_amount - amount_paid))
+    if balance <= 1e-6:
+        raise HTTPException(status_code=400, detail="Sale is already fully paid.")
+
+    if payment_amount > balance + 1e-6:
+        raise HTTPException(status_code=400, detail="Payment amount cannot exceed the outstanding balance.")
+
+    new_amount_paid = amount_paid + payment_amount
+    new_balance = total_amount - new_amount_paid
+    if new_balance < -1e-6:
+        raise HTTPException(status_code=400, detail="Calculated balance cannot be negative.")
+
+    payment_entry = {
+        "payment_amount": payment_amount,
+        # Client-side stamp: sentinels are not allowed within array values.
+        "payment_date": now,
+        "payment_note": payment_note,
+        "remaining_balance": max(new_balance, 0.0),
+    }
 
-        sale_totals = _normalize_sizes(sale_data.get("items", []))
-        total_return = sum(sale_totals.values())
+    # ArrayUnion appends server-side, so the growing history is never
+    # resent in full; the transactional read above pins the balance the
+    # absolute writes were computed from.
+    transaction.update(sale_ref, {
+        "amount_paid": new_amount_paid,
+        "balance": max(new_balance, 0.0),
+        "has_outstanding_balance": new_balance > 1e-6,
+        "payment_history": firestore.ArrayUnion([payment_entry]),
+        "updated_at": firestore.SERVER_TIMESTAMP,
+    })
+    return sale_data, payment_entry, new_amount_paid, new_balance
+
+
+async def _handle_make_payment(request, current_user, http_request):
+    payment_payload = request.payload
+
+    sale_ref = async_db.collection(SALES_COLLECTION).document(request.sale_id)
+    now = datetime.utcnow()
+    sale_data, payment_entry, new_amount_paid, new_balance = await _record_payment_in_transaction(
+        async_db.transaction(), sale_ref, float(payment_payload.payment_amount),
+        payment_payload.payment_note or "Credit payment", now,
+    )
+    sale_cache.invalidate(request.sale_id)
+
+    # Echo the merged payment state; no read-back needed.
+    updated_sale = {
+        **sale_data,
+        "amount_paid": new_amount_paid,
+        "balance": max(new_balance, 0.0),
+        "payment_history": [*(sale_data.get("payment_history") or []), payment_entry],
+        "updated_at": now,
+    }
+    return {
+        "status": "success",
+        "message": "Payment recorded successfully.",
+        "sale": _format_sale_data(sale_ref.id, updated_sale).model_dump(),
+    }
 
-        for size, qty in sale_totals.items():
-            inventory_sizes[size] = int(inventory_sizes.get(size, 0)) + qty
 
-        remaining_total = int(inventory_data.get("total_available", 0)) + total_return
+async def _handle_get_payment_history(request, current_user, http_request):
+    cached = sale_cache.get(request.sale_id)
+    if cached is None:
+        sale_doc = await async_db.collection(SALES_COLLECTION).document(request.sale_id).get()
+        if not sale_doc.exists:
+            raise HTTPException(status_code=404, detail="Sale not found.")
+        cached = sale_doc.to_dict() or {}
+        sale_cache.put(request.sale_id, cached)
 
-        now = datetime.utcnow()
-        inventory_ref.update({
-            "sizes": inventory_sizes,
-            "total_available": remaining_total,
-            "updated_at": now,
-        })
+    sale_data = _format_sale_data(request.sale_id, cached).model_dump()
+    return {
+        "sale_id": sale_data["id"],
+        "customer_name": sale_data["customer_name"],
+        "total_amount": sale_data["total_amount"],
+        "amount_paid": sale_data["amount_paid"],
+        "balance": sale_data["balance"],
+        "payment_history": sale_data["payment_history"],
+    }
 
-        sale_ref.delete()
-        response = {
-            "status": "success",
-            "message": f"Sale {request.sale_id} deleted.",
-            "restored_quantity": total_return
-        }
+
+async def _handle_delete(request, current_user, http_request):
+    sale_ref = async_db.collection(SALES_COLLECTION).document(request.sale_id)
+    sale_doc = await sale_ref.get()
+    if not sale_doc.exists:
+        raise HTTPException(status_code=404, detail="Sale not found.")
+
+    sale_data = sale_doc.to_dict()
+    balance = float(sale_data.get("balance", sale_data.get("total_amount", 0.0) - sale_data.get("amount_paid", 0.0)))
+    warning_message: Optional[str] = None
+    if balance > 1e-6:
+        if current_user["access_level"] != _LEVEL_2:
+            raise HTTPException(
+                status_code=403,
+                detail="Only Level 2 users can delete sales with outstanding balance."
+            )
+        warning_message = "Sale deleted with outstanding balance. Verify financial reconciliation."
+
+    design_id = sale_data.get("design_id")
+    if not design_id:
+        await sale_ref.delete()
+        sale_cache.invalidate(request.sale_id)
+        response = {"status": "success", "message": f"Sale {request.sale_id} deleted."}
         if warning_message:
             response["warning"] = warning_message
         return response
 
-    raise HTTPException(status_code=400, detail="Invalid sales action provided.")
+    inventory_ref = async_db.collection(INVENTORY_COLLECTION).document(design_id)
+    sale_totals = _normalize_sizes(sale_data.get("items", []))
+    total_return = sum(sale_totals.values())
+
+    await _delete_sale_in_transaction(
+        async_db.transaction(), sale_ref, inventory_ref, sale_totals, total_return,
+        design_id, float(sale_data.get("total_amount", 0.0))
+    )
+    sale_cache.invalidate(request.sale_id)
+    await cache.invalidate_inventory(design_id)
+    response = {
+        "status": "success",
+        "message": f"Sale {request.sale_id} deleted.",
+        "restored_quantity": total_return
+    }
+    if warning_message:
+        response["warning"] = warning_message
+    return response
+
+
+_DISPATCH = {
+    SaleAction.CREATE: _handle_create,
+    SaleAction.READ_ALL: _handle_read_all,
+    SaleAction.GET_BY_ID: _handle_get_by_id,
+    SaleAction.GET_BY_DESIGN: _handle_get_by_design,
+    SaleAction.GET_CREDIT_SALES: _handle_get_credit_sales,
+    SaleAction.COUNT_BY_DESIGN: _handle_count_by_design,
+    SaleAction.GET_SALES_SUMMARY: _handle_get_sales_summary,
+    SaleAction.UPDATE: _handle_update,
+    SaleAction.MAKE_PAYMENT: _handle_make_payment,
+    SaleAction.GET_PAYMENT_HISTORY: _handle_get_payment_history,
+    SaleAction.DELETE: _handle_delete,
+}
+
+
+@router.post("/operate", status_code=status.HTTP_200_OK)
+async def operate_sales(
+    request: SaleOperationRequest,
+    http_request: Request,
+    current_user: dict = Depends(get_current_user_with_access(AccessLevel.LEVEL_1))
+):
+    handler = _DISPATCH.get(request.action)
+    if handler is None:
+        raise HTTPException(status_code=400, detail="Invalid sales action provided.")
+    return await handler(request, current_user, http_request)
@@ -0,0 +1,94 @@
+import os
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+import orjson
+from cachetools import TTLCache
+
+# Inventory documents only change when a sale or production credit writes
+# them, so hot-path readers (quotation generation, stock lookups) can be
+# served from a short-TTL cache instead of a Firestore round trip. When
+# REDIS_URL is configured and the client library is available the cache
+# is shared across workers and accessed through redis.asyncio so the
+# event loop never blocks on a cache round trip; otherwise it degrades
+# to a process-local TTLCache with the same interface.
+try:
+    import redis.asyncio as _redis
+except ImportError:  # pragma: no cover - optional dependency
+    _redis = None
+
+_TTL_SECONDS = int(os.getenv("INVENTORY_CACHE_TTL", "60"))
+
+_REDIS_CLIENT = None
+_redis_url = os.getenv("REDIS_URL")
+if _redis is not None and _redis_url:
+    _REDIS_CLIENT = _redis.Redis.from_url(_redis_url)
+
+_LOCAL: TTLCache = TTLCache(maxsize=1024, ttl=_TTL_SECONDS)
+_LOCK = threading.Lock()
+
+# Request-scoped memo layered in front of the shared cache: repeat
+# lookups of the same design inside one request are answered without
+# touching Redis, and see a consistent snapshot for the whole request.
+_REQUEST_MEMO: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar(
+    "request_inventory_memo", default=None
+)
+
+
+def begin_request_scope() -> None:
+    """Install a fresh per-request memo; called by the app middleware."""
+    _REQUEST_MEMO.set({})
+
+
+def _key(design_id: str) -> str:
+    return f"inventory:{design_id}"
+
+
+async def get_inventory(design_id: str) -> Optional[Dict[str, Any]]:
+    """Return the cached inventory doc for a design, or None on a miss."""
+    key = _key(design_id)
+    memo = _REQUEST_MEMO.get()
+    if memo is not None and key in memo:
+        return memo[key]
+    if _REDIS_CLIENT is not None:
+        try:
+            raw = await _REDIS_CLIENT.get(key)
+        except Exception:
+            # A cache outage must never take down the read path.
+            return None
+        return orjson.loads(raw) if raw is not None else None
+    with _LOCK:
+        return _LOCAL.get(key)
+
+
+async def put_inventory(design_id: str, data: Dict[str, Any]) -> None:
+    key = _key(design_id)
+    memo = _REQUEST_MEMO.get()
+    if memo is not None:
+        memo[key] = data
+    if _REDIS_CLIENT is not None:
+        try:
+            # default=str renders Firestore timestamps as ISO strings.
+            await _REDIS_CLIENT.setex(key, _TTL_SECONDS, orjson.dumps(data, default=str))
+        except Exception:
+            pass
+        return
+    with _LOCK:
+        _LOCAL[key] = data
+
+
+async def invalidate_inventory(design_id: str) -> None:
+    """Drop the cached doc after any write that changes stock levels."""
+    key = _key(design_id)
+    memo = _REQUEST_MEMO.get()
+    if memo is not None:
+        memo.pop(key, None)
+    if _REDIS_CLIENT is not None:
+        try:
+            await _REDIS_CLIENT.delete(key)
+        except Exception:
+            pass
+        return
+    with _LOCK:
+        _LOCAL.pop(key, None)
@@ -0,0 +1,27 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+# Design documents change rarely but are read on every START_CUTTING
+# existence check and every COMPLETE_IRONING inventory adjustment. Cache
+# design_id -> (exists, size_map) for a few minutes; the design router
+# invalidates entries on CREATE/UPDATE/DELETE so mutations are visible
+# immediately within this process.
+_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=300)
+_LOCK = threading.Lock()
+
+
+def get(design_id: str) -> Optional[Tuple[bool, Dict[str, int]]]:
+    with _LOCK:
+        return _CACHE.get(design_id)
+
+
+def put(design_id: str, exists: bool, size_map: Dict[str, int]) -> None:
+    with _LOCK:
+        _CACHE[design_id] = (exists, size_map)
+
+
+def invalidate(design_id: str) -> None:
+    with _LOCK:
+        _CACHE.pop(design_id, None)
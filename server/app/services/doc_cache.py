@@ -0,0 +1,25 @@
+import threading
+
+from cachetools import TTLCache
+
+# Very short-lived cache of recently read/written documents, keyed by
+# (collection, doc_id). The 2-second TTL only bridges the window where a
+# client reads back a record it just touched, so staleness exposure is
+# bounded while repeat reads skip a Firestore round trip.
+_CACHE = TTLCache(maxsize=1024, ttl=2)
+_LOCK = threading.Lock()
+
+
+def get(collection: str, doc_id: str):
+    with _LOCK:
+        return _CACHE.get((collection, doc_id))
+
+
+def put(collection: str, doc_id: str, data: dict) -> None:
+    with _LOCK:
+        _CACHE[(collection, doc_id)] = data
+
+
+def invalidate(collection: str, doc_id: str) -> None:
+    with _LOCK:
+        _CACHE.pop((collection, doc_id), None)
@@ -1,6 +1,8 @@
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud import firestore as google_firestore
 import os
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -11,13 +13,33 @@ cred_path = os.getenv("FIREBASE_SERVICE_ACCOUNT_KEY_PATH")
 cred = credentials.Certificate(cred_path)
 firebase_admin.initialize_app(cred)
 
-# Get a reference to the Firestore database
-db = firestore.client()
+# A single gRPC channel serializes its HTTP/2 streams, so sync reads from
+# concurrent threadpool workers queue behind each other under load. Keep a
+# small pool of clients (one channel each) and spread threads across them.
+_POOL_SIZE = int(os.getenv("FIRESTORE_CLIENT_POOL_SIZE", "4"))
+_CLIENTS = [firestore.client()] + [
+    google_firestore.Client(project=cred.project_id, credentials=cred.get_credential())
+    for _ in range(_POOL_SIZE - 1)
+]
+
+# Default sync client, kept for modules that only need one.
+db = _CLIENTS[0]
+
+
+def get_db():
+    """Return a sync Firestore client, round-robined by calling thread."""
+    return _CLIENTS[threading.get_ident() % len(_CLIENTS)]
+
+# Async client for async def endpoints: lets handlers await Firestore I/O on
+# the event loop and overlap independent reads instead of serializing them.
+async_db = firestore_async.client()
 
 # Define collection names
 CLOTH_COLLECTION = "cloth_purchases"
 INVENTORY_COLLECTION = "inventory"
 SALES_COLLECTION = "sales"
+SALE_ROLLUP_COLLECTION = "sale_rollup"
 PRODUCTION_COLLECTION = "production_tracking"
 DESIGN_COLLECTION = "designs"
+DESIGN_TOTALS_COLLECTION = "design_totals"
 EXPENSES_COLLECTION = "expenses"
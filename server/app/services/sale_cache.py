@@ -0,0 +1,28 @@
+import threading
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+# Sale documents are re-read constantly from receipt and payment screens
+# while changing only on explicit mutations. A short TTL plus explicit
+# invalidation from the sale router keeps repeat GET_BY_ID and
+# GET_PAYMENT_HISTORY hits off Firestore.
+_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=60)
+_LOCK = threading.RLock()
+
+
+def get(sale_id: str) -> Optional[Dict[str, Any]]:
+    """Return the cached sale doc, or None when absent/expired."""
+    with _LOCK:
+        return _CACHE.get(sale_id)
+
+
+def put(sale_id: str, data: Dict[str, Any]) -> None:
+    with _LOCK:
+        _CACHE[sale_id] = data
+
+
+def invalidate(sale_id: str) -> None:
+    """Drop the cached doc after any mutation of the sale."""
+    with _LOCK:
+        _CACHE.pop(sale_id, None)
@@ -0,0 +1,50 @@
+"""
+One-off backfill: stamp has_outstanding_balance on existing sale documents.
+
+GET_CREDIT_SALES now filters on the denormalized has_outstanding_balance
+flag instead of a balance > 0 range scan. Sales written before the flag
+existed never match that equality filter, so every pre-existing document
+has to be stamped once with the flag derived from its stored balance.
+
+Usage:
+    FIREBASE_SERVICE_ACCOUNT_KEY_PATH=/path/to/key.json python scripts/backfill_sale_balance_flags.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.firebase_service import db, SALES_COLLECTION
+
+_BATCH_LIMIT = 400  # Firestore caps batches at 500 writes.
+
+
+def backfill():
+    stamped = skipped = 0
+    batch = db.batch()
+    pending = 0
+    for doc in db.collection(SALES_COLLECTION).stream():
+        data = doc.to_dict() or {}
+        if "has_outstanding_balance" in data:
+            skipped += 1
+            continue
+
+        total_amount = float(data.get("total_amount", 0.0))
+        amount_paid = float(data.get("amount_paid", 0.0))
+        balance = float(data.get("balance", total_amount - amount_paid))
+        batch.update(doc.reference, {"has_outstanding_balance": balance > 1e-6})
+        stamped += 1
+        pending += 1
+        if pending >= _BATCH_LIMIT:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+
+    if pending:
+        batch.commit()
+
+    print(f"Done. Stamped {stamped} document(s), skipped {skipped}.")
+
+
+if __name__ == "__main__":
+    backfill()
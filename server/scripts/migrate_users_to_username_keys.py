@@ -0,0 +1,48 @@
+"""
+One-off migration: re-key existing user documents by username.
+
+User documents were originally created with auto-generated IDs and looked up
+with a where('username', '==', ...) query. Auth now reads users by document ID
+(the username), so every pre-existing document has to be copied to
+users/{username} and the old auto-ID document deleted.
+
+Usage:
+    FIREBASE_SERVICE_ACCOUNT_KEY_PATH=/path/to/key.json python scripts/migrate_users_to_username_keys.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.firebase_service import db
+
+USERS_COLLECTION = "users"
+
+
+def migrate():
+    migrated = skipped = 0
+    for doc in db.collection(USERS_COLLECTION).stream():
+        data = doc.to_dict()
+        username = data.get("username")
+        if not username or doc.id == username:
+            skipped += 1
+            continue
+
+        target_ref = db.collection(USERS_COLLECTION).document(username)
+        if target_ref.get().exists:
+            print(f"Skipping {doc.id}: users/{username} already exists.")
+            skipped += 1
+            continue
+
+        batch = db.batch()
+        batch.set(target_ref, data)
+        batch.delete(doc.reference)
+        batch.commit()
+        migrated += 1
+        print(f"Migrated {doc.id} -> users/{username}")
+
+    print(f"Done. Migrated {migrated} document(s), skipped {skipped}.")
+
+
+if __name__ == "__main__":
+    migrate()